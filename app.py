@@ -2,12 +2,28 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 import numpy as np
-from scipy.interpolate import griddata
 from datetime import datetime
 import io
 import json
 import tempfile
+from functools import partial
 from interpolasi import generate_property_heatmap
+from triangulasi import sinkronkan_permukaan
+from extra_features import data_untuk_gridding
+from statistik import statistik_titik, hapus_statistik
+from kontur import hitung_kontur, level_kontur, interval_efektif, kontur_geojson, MAKS_LEVEL
+from ekspor_grid import FORMAT_GRID, grid_ke_bytes
+from closure import analisis_closure
+from volume_tin import volume_tin
+from kompartemen import baca_poligon, mask_poligon, volume_kompartemen
+from grid_lokal import RESOLUSI_TILE, viewport_dari_box, grid_tile
+from impor_excel import sheet_excel, preview_excel, iter_kolom_excel
+from validasi import validasi_csv, petakan_kolom, konvensi_z, bersihkan_xyz
+from figur import figur_2d_dasar, figur_3d, pasang_kontak_3d, figur_heatmap, figur_atribut, figur_perbandingan
+from atribut import ATRIBUT, atribut_struktur
+from survei_sumur import lintasan_sumur, potong_permukaan
+from workspace import (WORKSPACE_DB, PARAMETER, simpan_dataset, daftar_dataset,
+                       hapus_dataset, cari_bbox, cari_lapangan, muat_ke_session, lepas_parameter)
 
 # ReportLab untuk PDF ringkasan volumetrik
 from reportlab.lib.pagesizes import A4
@@ -158,6 +174,22 @@ def create_volumetric_report_excel(vol_gas_cap, vol_oil_zone, vol_total_res,
     buffer.seek(0)
     return buffer
 
+def tampilkan_perbandingan_3d(file_before, file_after):
+    """Interpolasi & plot dua dataset (Before/After) beserta selisihnya"""
+    # interpolasi & figure di-cache per isi kedua file
+    fig, fig_diff, error = figur_perbandingan(file_before.getvalue(), file_after.getvalue())
+    if error:
+        st.error(error)
+        return
+    st.plotly_chart(fig, use_container_width=True)
+
+    # ===== SELISIH =====
+    st.subheader("📉 Selisih Elevasi (After – Before)")
+    if fig_diff is None:
+        st.warning("Grid Before dan After tidak cocok ukurannya.")
+    else:
+        st.plotly_chart(fig_diff, use_container_width=True)
+
 # --- JUDUL UTAMA ---
 st.title("Proyek Pemetaan Bawah Permukaan IF-A")
 st.title("🌍 3D Reservoir Visualization")
@@ -191,6 +223,8 @@ with st.sidebar:
 
     # --- BAGIAN B: STATUS DATA ---
     df = pd.DataFrame(st.session_state['data_points'])
+    # Statistik satu-pass (hanya titik baru yang diproses tiap rerun)
+    stats = statistik_titik(st.session_state)
     
     if not df.empty:
         st.divider()
@@ -198,18 +232,20 @@ with st.sidebar:
         
         m1, m2 = st.columns(2)
         m1.metric("Total Titik", len(df))
-        m2.metric("Kedalaman Max", f"{df['Z'].max()} m")
+        m2.metric("Kedalaman Max", f"{stats['Z'].max:,.2f} m")
         
         # --- BAGIAN C: KONTAK FLUIDA ---
         st.divider()
         st.markdown("### 💧 Kontak Fluida")
         
-        min_z, max_z = df['Z'].min(), df['Z'].max()
+        min_z, max_z = stats.rentang('Z')
+        # parameter tersimpan dari workspace (kalau lapangan dibuka dari sana)
+        param_ws = st.session_state.get('_param_ws', {})
         
         st.markdown(":red[Gas-Oil Contact (GOC)]")
         goc_input = st.number_input(
             "",
-            value=float(min_z + (max_z - min_z) * 0.3),
+            value=float(param_ws.get('goc', min_z + (max_z - min_z) * 0.3)),
             key="goc",
             label_visibility="collapsed"
         )
@@ -217,7 +253,7 @@ with st.sidebar:
         st.markdown(":blue[Water-Oil Contact (WOC)]")
         woc_input = st.number_input(
             "",
-            value=float(min_z + (max_z - min_z) * 0.7),
+            value=float(param_ws.get('woc', min_z + (max_z - min_z) * 0.7)),
             key="woc",
             label_visibility="collapsed"
         )
@@ -229,11 +265,11 @@ with st.sidebar:
         st.divider()
         with st.expander("🧮 Parameter Petrofisika (Baru)", expanded=True):
             st.caption("Digunakan untuk menghitung STOIIP/GIIP")
-            porosity = st.slider("Porositas (ϕ)", 0.05, 0.40, 0.20, 0.01)
-            sw = st.slider("Water Saturation (Sw)", 0.1, 1.0, 0.3, 0.05)
-            ntg = st.slider("Net-to-Gross (NTG)", 0.1, 1.0, 0.8, 0.05)
-            bo = st.number_input("Faktor Vol. Formasi Minyak (Bo)", 1.0, 2.0, 1.2)
-            bg = st.number_input("Faktor Ekspansi Gas (Bg)", 0.001, 0.1, 0.005, format="%.4f")
+            porosity = st.slider("Porositas (ϕ)", 0.05, 0.40, param_ws.get('porosity', 0.20), 0.01)
+            sw = st.slider("Water Saturation (Sw)", 0.1, 1.0, param_ws.get('sw', 0.3), 0.05)
+            ntg = st.slider("Net-to-Gross (NTG)", 0.1, 1.0, param_ws.get('ntg', 0.8), 0.05)
+            bo = st.number_input("Faktor Vol. Formasi Minyak (Bo)", 1.0, 2.0, param_ws.get('bo', 1.2))
+            bg = st.number_input("Faktor Ekspansi Gas (Bg)", 0.001, 0.1, param_ws.get('bg', 0.005), format="%.4f")
     
     st.markdown("---")
     
@@ -241,38 +277,69 @@ with st.sidebar:
     with st.expander("📂 Upload File", expanded=True):
         uploaded_file = st.file_uploader("Upload CSV/Excel (Wajib: X, Y, Z)", type=["csv", "xlsx"])
         
-        if uploaded_file is not None:
+        if uploaded_file is not None and not uploaded_file.name.endswith('.csv'):
+            # Excel dibaca streaming (calamine / openpyxl read-only), pilih sheet & mapping kolom
             try:
-                if uploaded_file.name.endswith('.csv'):
-                    df_upload = pd.read_csv(uploaded_file)
+                data_xlsx = uploaded_file.getvalue()
+                sheet = st.selectbox("Sheet", sheet_excel(data_xlsx), key="xlsx_sheet")
+                preview = preview_excel(data_xlsx, sheet)
+                st.caption("🔎 Preview data yang kamu upload:")
+                st.dataframe(preview, use_container_width=True)
+
+                kolom = list(preview.columns)
+                if not kolom:
+                    st.error("❌ Eits, sheet ini kosong !")
                 else:
-                    df_upload = pd.read_excel(uploaded_file)
-                    
+                    mapping = {}
+                    alias = petakan_kolom(kolom)
+                    for col_map, target in zip(st.columns(3), ('X', 'Y', 'Z')):
+                        mapping[target] = col_map.selectbox(
+                            f"Kolom {target}", kolom, key=f"xlsx_{target}",
+                            index=kolom.index(alias[target]) if alias[target] else 0)
+                    if len(set(mapping.values())) < 3:
+                        st.error("Kolom X, Y, Z harus berbeda.")
+                    elif st.button("📥 Muat Data ke Aplikasi", type="primary", key="muat_xlsx"):
+                        # Sheet tetap di-stream per potongan, tapi 3 kolom X/Y/Z ditampung dulu (float64,
+                        # 24 byte/baris): aturan mayoritas-Z-negatif di konvensi_z harus melihat seluruh
+                        # kolom seperti jalur CSV; 5 baris preview bisa membalik tanda seluruh sheet.
+                        with st.spinner("Membaca Excel..."):
+                            arr = np.concatenate(list(iter_kolom_excel(data_xlsx, sheet, list(mapping.values()))) or
+                                                 [np.empty((0, 3))])
+                        balik_z, pesan_z = konvensi_z(mapping['Z'], arr[:, 2])
+                        bersih, n_nan, n_inf = bersihkan_xyz(arr, balik_z)
+                        st.session_state['data_points'].extend(
+                            {'X': x, 'Y': y, 'Z': z} for x, y, z in bersih.tolist())
+                        st.toast(f"Berhasil menambahkan {len(bersih)} titik!", icon='✅')
+                        if pesan_z:
+                            st.toast(pesan_z, icon="⚠")
+                        if n_nan + n_inf:
+                            st.toast(f"{n_nan + n_inf} baris dilewati (X/Y/Z kosong, bukan angka, atau inf).", icon="⚠")
+                        st.rerun()
+            except Exception as e:
+                st.error(f"Error membaca file: {e}")
+        elif uploaded_file is not None:
+            try:
+                # Validasi ingest (alias kolom, numerik, NaN/inf, tanda Z) di-cache per isi file
+                hasil_validasi = validasi_csv(uploaded_file.getvalue())
+
                 st.caption("🔎 Preview data yang kamu upload:")
-                st.dataframe(df_upload.head(), use_container_width=True)
-                
-                df_upload.columns = [c.upper() for c in df_upload.columns]
-
-                # Fitur: Mengecek kekosongan data & integritas awal
-                if df_upload.empty:
-                    st.error("❌ Eits, file ini kosong !")
-                    st.stop() # Stop program biar gak error di bawah
-                
-                # Cek sekilas apakah data aman
-                if {'X', 'Y', 'Z'}.issubset(df_upload.columns):
-                    st.toast("✅ Data Integrity Check: OK", icon="🛡")
-                    
-                required_cols = {'X', 'Y', 'Z'}
-                
-                if required_cols.issubset(df_upload.columns):
-                    st.success(f"File valid! {len(df_upload)} baris data.")
+                st.dataframe(hasil_validasi['preview'], use_container_width=True)
+
+                if hasil_validasi['error']:
+                    st.error(hasil_validasi['error'])
+                else:
+                    df_upload = hasil_validasi['df']
+                    pemetaan = ", ".join(f"{t} ← {c}" for t, c in hasil_validasi['mapping'].items() if t != c)
+                    if pemetaan:
+                        st.caption(f"Kolom dipetakan: {pemetaan}")
+                    for pesan in hasil_validasi['pesan']:
+                        st.warning(pesan)
+                    st.success(f"File valid! {len(df_upload)} dari {hasil_validasi['n_total']} baris data.")
                     if st.button("📥 Muat Data ke Aplikasi", type="primary"):
-                        new_data = df_upload[['X', 'Y', 'Z']].to_dict('records')
+                        new_data = df_upload.to_dict('records')
                         st.session_state['data_points'].extend(new_data)
                         st.toast(f"Berhasil menambahkan {len(new_data)} titik!", icon='✅')
                         st.rerun()
-                else:
-                    st.error(f"Format salah! File harus punya kolom: {required_cols}")
             except Exception as e:
                 st.error(f"Error membaca file: {e}")
 
@@ -280,6 +347,7 @@ with st.sidebar:
     with st.expander("⚙ Pengaturan Data", expanded=False):
         if st.button("🔄 Reset Semua Data"):
             st.session_state['data_points'] = []
+            lepas_parameter(st.session_state)
             st.rerun()
         
         if st.button("📂 Load Data Demo"):
@@ -292,12 +360,14 @@ with st.sidebar:
                 {'X': 150, 'Y': 150, 'Z': 1100}, {'X': 250, 'Y': 250, 'Z': 1100},
                 {'X': 150, 'Y': 250, 'Z': 1100}, {'X': 250, 'Y': 150, 'Z': 1100}
             ]
+            lepas_parameter(st.session_state)
             st.rerun()
             
         # --- Hapus titik terakhir ---
         if st.button("➖ Hapus Titik Terakhir"):
             if len(st.session_state['data_points']) > 0:
                 removed = st.session_state['data_points'].pop()
+                hapus_statistik(st.session_state, [removed])
                 st.toast(f"Titik terakhir {removed} dihapus.", icon="🗑")
                 st.rerun()
             else:
@@ -308,11 +378,10 @@ with st.sidebar:
         st.markdown("### 📤 Export CSV")
 
         if not df.empty:
-            csv_data = df.to_csv(index=False).encode('utf-8')
-
+            # file dibuat saat tombol diklik; df di-snapshot karena kolom Fluid ditambahkan belakangan
             st.download_button(
                 label="⬇ Download CSV Data",
-                data=csv_data,
+                data=partial(df.copy().to_csv, index=False),
                 file_name=f"reservoir_points_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
                 mime="text/csv"
             )
@@ -323,10 +392,9 @@ with st.sidebar:
         col_save1, col_save2 = st.columns(2)
         
         with col_save1:
-            session_json = json.dumps(st.session_state['data_points'], indent=2)
             st.download_button(
                 label="💾 Save Session",
-                data=session_json,
+                data=partial(json.dumps, st.session_state['data_points'], indent=2),
                 file_name=f"reservoir_session_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
                 mime="application/json",
                 help="Simpan data session untuk digunakan kembali"
@@ -342,6 +410,7 @@ with st.sidebar:
                     ):
                         if st.button("📥 Muat Session", key="load_session"):
                             st.session_state['data_points'] = session_data
+                            lepas_parameter(st.session_state)
                             st.toast("Session berhasil dimuat!", icon='✅')
                             st.rerun()
                     else:
@@ -349,6 +418,50 @@ with st.sidebar:
                 except Exception as e:
                     st.error(f"Error membaca session: {e}")
 
+    # --- WORKSPACE PROYEK (SQLite lokal, banyak lapangan) ---
+    with st.expander("🗄 Workspace Proyek", expanded=False):
+        st.caption(f"Disimpan offline di `{WORKSPACE_DB}`")
+        try:
+            daftar = daftar_dataset()
+        except Exception as e:
+            daftar = pd.DataFrame(columns=['Nama'])
+            st.error(f"Workspace tidak bisa dibuka: {e}")
+
+        nama_ws = st.text_input("Nama Lapangan", key="ws_nama")
+        if st.button("💾 Simpan ke Workspace", disabled=df.empty or not nama_ws):
+            parameter = dict(zip(PARAMETER, map(float, (goc_input, woc_input, porosity, sw, ntg, bo, bg))))
+            simpan_dataset(nama_ws, st.session_state['data_points'], parameter,
+                           st.session_state.get('_permukaan'))
+            st.toast(f"Lapangan '{nama_ws}' tersimpan!", icon='✅')
+            st.rerun()
+
+        if not daftar.empty:
+            st.dataframe(daftar, use_container_width=True, hide_index=True)
+            opsi_ws = list(daftar['Nama'])
+            # R-tree extent lapangan: saring lapangan yang beririsan dengan bbox data aktif
+            if st.checkbox("Hanya lapangan di sekitar data aktif", key="ws_sekitar", disabled=df.empty) \
+                    and not df.empty:
+                opsi_ws = cari_lapangan(*stats.rentang('X'), *stats.rentang('Y'))
+                st.caption(f"{len(opsi_ws)} dari {len(daftar)} lapangan beririsan dengan data aktif")
+            pilih_ws = st.selectbox("Pilih Lapangan", opsi_ws, key="ws_pilih")
+            col_ws1, col_ws2 = st.columns(2)
+            col_ws1.button("📂 Buka", key="ws_buka", on_click=muat_ke_session,
+                           args=(st.session_state, pilih_ws), disabled=pilih_ws is None)
+            if col_ws2.button("🗑 Hapus", key="ws_hapus", disabled=pilih_ws is None):
+                hapus_dataset(pilih_ws)
+                st.rerun()
+
+            st.markdown("**🔍 Cari Titik (Bounding Box)**")
+            col_bb1, col_bb2 = st.columns(2)
+            bb_xmin = col_bb1.number_input("X Min", value=float(daftar['X_Min'].min()), key="bb_xmin")
+            bb_xmax = col_bb2.number_input("X Max", value=float(daftar['X_Max'].max()), key="bb_xmax")
+            bb_ymin = col_bb1.number_input("Y Min", value=float(daftar['Y_Min'].min()), key="bb_ymin")
+            bb_ymax = col_bb2.number_input("Y Max", value=float(daftar['Y_Max'].max()), key="bb_ymax")
+            if st.button("🔍 Cari", key="bb_cari"):
+                hasil_bb = cari_bbox(bb_xmin, bb_xmax, bb_ymin, bb_ymax)
+                st.caption(f"{len(hasil_bb)} titik dari {hasil_bb['Lapangan'].nunique()} lapangan")
+                st.dataframe(hasil_bb, use_container_width=True, hide_index=True)
+
 # --- 3. LOGIC VISUALISASI UTAMA ---
 if df.empty:
     st.info("👈 Silakan masukkan data koordinat melalui panel di sebelah kiri.")
@@ -356,46 +469,25 @@ if df.empty:
 else:
     # Minimal 4 titik untuk kontur yang baik
     if len(df) >= 4:
-        df_unique = df.groupby(['X', 'Y'], as_index=False)['Z'].mean()
-        grid_x = np.linspace(df['X'].min(), df['X'].max(), 100)
-        grid_y = np.linspace(df['Y'].min(), df['Y'].max(), 100)
-        grid_x, grid_y = np.meshgrid(grid_x, grid_y)
-
-        try:
-            grid_z = griddata(
-                (df_unique['X'], df_unique['Y']),
-                df_unique['Z'],
-                (grid_x, grid_y),
-                method='cubic'
-            )
-        except Exception:
-            grid_z = griddata(
-                (df_unique['X'], df_unique['Y']),
-                df_unique['Z'],
-                (grid_x, grid_y),
-                method='linear'
-            )
+        # Triangulasi disimpan di session_state: tambah/hapus titik cukup update lokal
+        df_grid = data_untuk_gridding(df)
+        surface = sinkronkan_permukaan(st.session_state, df_grid)
+        grid_z = surface.grid_z  # grid ringkas: sumbu 1-D surface.xs/ys + satu array Z
 
         # --- PERHITUNGAN VOLUME ---
         st.markdown("### 📊 Estimasi Volume & Cadangan")
         
-        x_min, x_max = df['X'].min(), df['X'].max()
-        y_min, y_max = df['Y'].min(), df['Y'].max()
-        nx, ny = 100, 100
+        x_min, x_max = df_grid['X'].min(), df_grid['X'].max()
+        y_min, y_max = df_grid['Y'].min(), df_grid['Y'].max()
+        cell_area = surface.luas_sel
         
-        dx = (x_max - x_min) / (nx - 1)
-        dy = (y_max - y_min) / (ny - 1)
-        cell_area = dx * dy
-        
-        # Volume di atas WOC (Total Reservoir)
-        thick_above_woc = woc_input - grid_z
-        thick_above_woc[thick_above_woc < 0] = 0
-        vol_total_res = np.nansum(thick_above_woc) * cell_area
+        # Volume di atas WOC (Total Reservoir) — tebal dihitung in-place, dtype grid
+        thick_above_woc = surface.tebal_di_atas(woc_input)
+        vol_total_res = np.nansum(thick_above_woc, dtype=float) * cell_area
         
         # Volume di atas GOC (Gas Cap)
-        thick_above_goc = goc_input - grid_z
-        thick_above_goc[thick_above_goc < 0] = 0
-        vol_gas_cap = np.nansum(thick_above_goc) * cell_area
+        thick_above_goc = surface.tebal_di_atas(goc_input)
+        vol_gas_cap = np.nansum(thick_above_goc, dtype=float) * cell_area
         
         # Volume Oil = selisih
         vol_oil_zone = max(0, vol_total_res - vol_gas_cap)
@@ -415,155 +507,204 @@ else:
         c_res1, c_res2 = st.columns(2)
         c_res1.metric("🔥 GIIP (Gas In Place)", f"{giip/1e9:.2f} BCF", help="Miliar Kaki Kubik")
         c_res2.metric("🛢 STOIIP (Oil In Place)", f"{stoiip/1e6:.2f} MMbbls", help="Juta Barel Minyak")
+
+        # Cek silang: GRV eksak langsung dari TIN (tanpa grid, tidak tergantung resolusi).
+        # Hanya dihitung kalau diminta: triangulasi global dibangun ulang setelah edit titik,
+        # jadi tidak boleh jalan di setiap rerun (update inkremental tetap murah).
+        with st.expander("📐 Cek Silang Volume TIN (eksak, tanpa grid)"):
+            if st.toggle("Hitung volume TIN", key="cek_tin"):
+                xy_unik, z_unik = surface.titik_unik()
+                vol_tin = volume_tin(xy_unik, z_unik, surface.tri.simplices, goc_input, woc_input)
+                def selisih(a, b): return f"{(a - b) / b * 100:+.1f}% vs grid" if b else None
+                col_t1, col_t2, col_t3 = st.columns(3)
+                col_t1.metric("🔴 Gas (TIN)", fmt_vol(vol_tin['gas']), selisih(vol_tin['gas'], vol_gas_cap), delta_color="off")
+                col_t2.metric("🟢 Oil (TIN)", fmt_vol(vol_tin['oil']), selisih(vol_tin['oil'], vol_oil_zone), delta_color="off")
+                col_t3.metric("🔵 Total (TIN)", fmt_vol(vol_tin['total']), selisih(vol_tin['total'], vol_total_res), delta_color="off")
+            st.caption("TIN memakai interpolasi linear per segitiga Delaunay dari titik unik, "
+                       "prisma dipotong bidang GOC/WOC secara analitik. Selisih terhadap grid "
+                       "berasal dari interpolasi cubic dan resolusi grid 100x100.")
+
+        # Volume per blok lisensi / kompartemen sesar dari poligon
+        poligon = {}
+        with st.expander("🧩 Volume per Kompartemen / Blok Lisensi"):
+            file_poligon = st.file_uploader("Upload poligon (GeoJSON atau CSV NAMA,X,Y)",
+                                            type=["geojson", "json", "csv"], key="file_poligon")
+            if file_poligon is not None:
+                try:
+                    poligon = baca_poligon(file_poligon)
+                except Exception as e:
+                    st.error(f"Gagal membaca poligon: {e}")
+            if poligon:
+                # mask di-cache per poligon + grid; ganti kontak cukup reduksi ber-mask
+                masks = {k: mask_poligon(v, surface.xs, surface.ys) for k, v in poligon.items()}
+                df_komp = volume_kompartemen(masks, thick_above_woc, thick_above_goc, cell_area,
+                                             ntg, porosity, sw, bo, bg)
+                st.dataframe(df_komp.round(3), use_container_width=True, hide_index=True)
+                st.caption("Poligon yang saling tumpang tindih dihitung di masing-masing kompartemen.")
+                st.download_button("⬇ Download Volume Kompartemen (CSV)",
+                                   data=df_komp.to_csv(index=False).encode(),
+                                   file_name="volume_kompartemen.csv", mime="text/csv")
+            else:
+                st.caption("Belum ada poligon — volume dihitung untuk seluruh area grid.")
         # -------------------------------------------------------------------
 #  🔥  STOIIP / GIIP SENSITIVITY CALCULATOR (DIPERBAIKI)
 # -------------------------------------------------------------------
 
 st.markdown("## 📈 STOIIP & GIIP Sensitivity Calculator")
 
-with st.expander("⚙ Pengaturan Sensitivity", expanded=True):
+# sweep & Smart Assistant sebagai fragment: ubah pengaturan / klik jalankan
+# tidak me-rerun gridding, peta dan tab lain
+@st.fragment
+def panel_sensitivity(vol_oil_zone, vol_gas_cap, stoiip, porosity, sw, ntg, bo, bg, goc_input, woc_input, stats):
+    with st.expander("⚙ Pengaturan Sensitivity", expanded=True):
 
-    sweep_param = st.selectbox(
-        "Parameter yang di-sweep:",
-        ["Porosity (ϕ)", "Water Saturation (Sw)", "NTG", "Bo", "Bg"]
-    )
+        sweep_param = st.selectbox(
+            "Parameter yang di-sweep:",
+            ["Porosity (ϕ)", "Water Saturation (Sw)", "NTG", "Bo", "Bg"]
+        )
 
-    sweep_min = st.number_input("Nilai Minimum Sweep", value=0.1)
-    sweep_max = st.number_input("Nilai Maksimum Sweep", value=0.4)
-    sweep_step = st.number_input("Step Sweep", value=0.02)
+        sweep_min = st.number_input("Nilai Minimum Sweep", value=0.1)
+        sweep_max = st.number_input("Nilai Maksimum Sweep", value=0.4)
+        sweep_step = st.number_input("Step Sweep", value=0.02)
 
-    run_sensitivity = st.button("🚀 Jalankan Sensitivity Analysis")
+        run_sensitivity = st.button("🚀 Jalankan Sensitivity Analysis")
 
 
-# ------ KODE SENSITIVITY DI LUAR EXPANDER ------
-if run_sensitivity:
+    # ------ KODE SENSITIVITY DI LUAR EXPANDER ------
+    if run_sensitivity:
 
-    sweep_values = np.arange(sweep_min, sweep_max + sweep_step, sweep_step)
-    results = []
+        sweep_values = np.arange(sweep_min, sweep_max + sweep_step, sweep_step)
+        results = []
 
-    for v in sweep_values:
+        for v in sweep_values:
 
-        # salin parameter asli
-        s_phi = porosity
-        s_sw  = sw
-        s_ntg = ntg
-        s_bo  = bo
-        s_bg  = bg
+            # salin parameter asli
+            s_phi = porosity
+            s_sw  = sw
+            s_ntg = ntg
+            s_bo  = bo
+            s_bg  = bg
 
-        # ganti parameter sesuai sweep
-        if sweep_param == "Porosity (ϕ)":      s_phi = v
-        elif sweep_param == "Water Saturation (Sw)": s_sw = v
-        elif sweep_param == "NTG":             s_ntg = v
-        elif sweep_param == "Bo":              s_bo = v
-        elif sweep_param == "Bg":              s_bg = v
+            # ganti parameter sesuai sweep
+            if sweep_param == "Porosity (ϕ)":      s_phi = v
+            elif sweep_param == "Water Saturation (Sw)": s_sw = v
+            elif sweep_param == "NTG":             s_ntg = v
+            elif sweep_param == "Bo":              s_bo = v
+            elif sweep_param == "Bg":              s_bg = v
 
-        # hitung ulang STOIIP / GIIP
-        s_stoiip = (vol_oil_zone * s_ntg * s_phi * (1 - s_sw)) / s_bo
-        s_giip   = (vol_gas_cap *  s_ntg * s_phi * (1 - s_sw)) / s_bg
+            # hitung ulang STOIIP / GIIP
+            s_stoiip = (vol_oil_zone * s_ntg * s_phi * (1 - s_sw)) / s_bo
+            s_giip   = (vol_gas_cap *  s_ntg * s_phi * (1 - s_sw)) / s_bg
 
-        results.append([v, s_stoiip/1e6, s_giip/1e9])  # MMbbls & BCF
+            results.append([v, s_stoiip/1e6, s_giip/1e9])  # MMbbls & BCF
 
-    # ---- BUAT DATAFRAME FINAL ----
-    df_sens = pd.DataFrame(
-        results,
-        columns=["Parameter Value", "STOIIP (MMbbls)", "GIIP (BCF)"]
-    )
+        # ---- BUAT DATAFRAME FINAL ----
+        df_sens = pd.DataFrame(
+            results,
+            columns=["Parameter Value", "STOIIP (MMbbls)", "GIIP (BCF)"]
+        )
 
-    st.markdown("### 📊 Hasil Sensitivity")
-    st.dataframe(df_sens, use_container_width=True)
+        st.markdown("### 📊 Hasil Sensitivity")
+        st.dataframe(df_sens, use_container_width=True)
 
-    # ---- Grafik ----
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=df_sens["Parameter Value"],
-        y=df_sens["STOIIP (MMbbls)"],
-        mode='lines+markers',
-        name="STOIIP (MMbbls)"
-    ))
-    fig.add_trace(go.Scatter(
-        x=df_sens["Parameter Value"],
-        y=df_sens["GIIP (BCF)"],
-        mode='lines+markers',
-        name="GIIP (BCF)"
-    ))
+        # ---- Grafik ----
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=df_sens["Parameter Value"],
+            y=df_sens["STOIIP (MMbbls)"],
+            mode='lines+markers',
+            name="STOIIP (MMbbls)"
+        ))
+        fig.add_trace(go.Scatter(
+            x=df_sens["Parameter Value"],
+            y=df_sens["GIIP (BCF)"],
+            mode='lines+markers',
+            name="GIIP (BCF)"
+        ))
 
-    fig.update_layout(
-        title=f"Sensitivity Result — {sweep_param}",
-        xaxis_title=sweep_param,
-        yaxis_title="Volume",
-        height=400
-    )
+        fig.update_layout(
+            title=f"Sensitivity Result — {sweep_param}",
+            xaxis_title=sweep_param,
+            yaxis_title="Volume",
+            height=400
+        )
 
-    st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True)
 
-    # ---- Download Sensitivity Result ----
-    csv_sens = df_sens.to_csv(index=False).encode('utf-8')
-    st.download_button(
-        label="⬇ Download Sensitivity (CSV)",
-        data=csv_sens,
-        file_name="sensitivity_result.csv",
-        mime="text/csv"
-    )
+        # ---- Download Sensitivity Result ----
+        csv_sens = df_sens.to_csv(index=False).encode('utf-8')
+        st.download_button(
+            label="⬇ Download Sensitivity (CSV)",
+            data=csv_sens,
+            file_name="sensitivity_result.csv",
+            mime="text/csv"
+        )
+                # ===============================================
+            #  🤖 NEW FEATURE: SMART ASSISTANT INTEGRATION
             # ===============================================
-        #  🤖 NEW FEATURE: SMART ASSISTANT INTEGRATION
-        # ===============================================
-    st.markdown("---")
-    st.subheader("🤖 Smart Assistant: Interpretasi Otomatis")
-        
-    with st.container(border=True):
-        col_assist1, col_assist2 = st.columns([1, 2])
-            
-            # Kolom Kiri: Analisis Kedalaman Sederhana
-    with col_assist1:
-        st.write("#### 📝 Ringkasan Lapangan")
-        avg_depth = df['Z'].mean()
-                
-                # Logic: Kategori Kedalaman
-        if avg_depth < 1000:
-            depth_status = "Dangkal (Shallow)"
-            depth_icon = "☀️"
-            depth_desc = "Biaya pengeboran relatif murah."
-        elif avg_depth < 2500:
-            depth_status = "Menengah (Medium)"
-            depth_icon = "🌊"
-            depth_desc = "Operasional standar."
-        else:
-            depth_status = "Dalam (Deep)"
-            depth_icon = "⚓"
-            depth_desc = "Memerlukan rig spesifikasi tinggi."
-                
-        st.metric(label="Rata-rata Kedalaman", value=f"{avg_depth:.0f} m", delta=depth_status, delta_color="off")
-        st.info(f"{depth_icon} {depth_desc}")
-
-            # Kolom Kanan: Analisis Detail (Logic If-Else)
-        with col_assist2:
-            st.write("#### 🧠 Analisis Reservoir")
-            analysis_points = []
-                
-                # Logic 1: Kualitas Batuan (Porositas)
-        if porosity >= 0.25:
-             analysis_points.append(f"✅ **Kualitas Batuan Sangat Baik** (Porositas {porosity*100:.0f}%): Batuan memiliki ruang pori yang besar, minyak mudah tersimpan.")
-        elif porosity >= 0.15:
-            analysis_points.append(f"⚖️ **Kualitas Batuan Cukup Baik** (Porositas {porosity*100:.0f}%): Kualitas reservoir standar industri.")
-        else:
-             analysis_points.append(f"⚠️ **Kualitas Batuan Rendah** (Porositas {porosity*100:.0f}%): Batuan 'tight', mungkin membutuhkan stimulasi (fracking).")
-
-                # Logic 2: Skala Cadangan (STOIIP)
-        stoiip_mmbbls = stoiip / 1e6
-        if stoiip_mmbbls > 50:
-            analysis_points.append(f"🌟 **Potensi Besar (Giant Field)**: Cadangan {stoiip_mmbbls:.1f} MMbbls sangat ekonomis dan strategis.")
-        elif stoiip_mmbbls > 5:
-            analysis_points.append(f"💰 **Potensi Komersial**: Cadangan {stoiip_mmbbls:.1f} MMbbls layak dikembangkan secara ekonomi.")
-        else:
-            analysis_points.append(f"📉 **Potensi Marginal**: Cadangan {stoiip_mmbbls:.1f} MMbbls tergolong kecil, perlu perhitungan biaya yang ketat.")
-                
-                # Logic 3: Fluid Contact Warning
-        if (woc_input - goc_input) > 0 and (woc_input - goc_input) < 10:
-            analysis_points.append("🚨 **Warning Zona Minyak**: Zona minyak sangat tipis (< 10m). Hati-hati terhadap 'coning' air atau gas saat produksi.")
-                
-                # Render Bullet Points
-        for point in analysis_points:
-            st.markdown(point)
+        st.markdown("---")
+        st.subheader("🤖 Smart Assistant: Interpretasi Otomatis")
+
+        with st.container(border=True):
+            col_assist1, col_assist2 = st.columns([1, 2])
+
+                # Kolom Kiri: Analisis Kedalaman Sederhana
+        with col_assist1:
+            st.write("#### 📝 Ringkasan Lapangan")
+            avg_depth = stats['Z'].mean
+
+                    # Logic: Kategori Kedalaman
+            if avg_depth < 1000:
+                depth_status = "Dangkal (Shallow)"
+                depth_icon = "☀️"
+                depth_desc = "Biaya pengeboran relatif murah."
+            elif avg_depth < 2500:
+                depth_status = "Menengah (Medium)"
+                depth_icon = "🌊"
+                depth_desc = "Operasional standar."
+            else:
+                depth_status = "Dalam (Deep)"
+                depth_icon = "⚓"
+                depth_desc = "Memerlukan rig spesifikasi tinggi."
+
+            st.metric(label="Rata-rata Kedalaman", value=f"{avg_depth:.0f} m", delta=depth_status, delta_color="off")
+            st.info(f"{depth_icon} {depth_desc}")
+
+                # Kolom Kanan: Analisis Detail (Logic If-Else)
+            with col_assist2:
+                st.write("#### 🧠 Analisis Reservoir")
+                analysis_points = []
+
+                    # Logic 1: Kualitas Batuan (Porositas)
+            if porosity >= 0.25:
+                 analysis_points.append(f"✅ **Kualitas Batuan Sangat Baik** (Porositas {porosity*100:.0f}%): Batuan memiliki ruang pori yang besar, minyak mudah tersimpan.")
+            elif porosity >= 0.15:
+                analysis_points.append(f"⚖️ **Kualitas Batuan Cukup Baik** (Porositas {porosity*100:.0f}%): Kualitas reservoir standar industri.")
+            else:
+                 analysis_points.append(f"⚠️ **Kualitas Batuan Rendah** (Porositas {porosity*100:.0f}%): Batuan 'tight', mungkin membutuhkan stimulasi (fracking).")
+
+                    # Logic 2: Skala Cadangan (STOIIP)
+            stoiip_mmbbls = stoiip / 1e6
+            if stoiip_mmbbls > 50:
+                analysis_points.append(f"🌟 **Potensi Besar (Giant Field)**: Cadangan {stoiip_mmbbls:.1f} MMbbls sangat ekonomis dan strategis.")
+            elif stoiip_mmbbls > 5:
+                analysis_points.append(f"💰 **Potensi Komersial**: Cadangan {stoiip_mmbbls:.1f} MMbbls layak dikembangkan secara ekonomi.")
+            else:
+                analysis_points.append(f"📉 **Potensi Marginal**: Cadangan {stoiip_mmbbls:.1f} MMbbls tergolong kecil, perlu perhitungan biaya yang ketat.")
+
+                    # Logic 3: Fluid Contact Warning
+            if (woc_input - goc_input) > 0 and (woc_input - goc_input) < 10:
+                analysis_points.append("🚨 **Warning Zona Minyak**: Zona minyak sangat tipis (< 10m). Hati-hati terhadap 'coning' air atau gas saat produksi.")
+
+                    # Render Bullet Points
+            for point in analysis_points:
+                st.markdown(point)
+
+if len(df) >= 4:
+    panel_sensitivity(vol_oil_zone, vol_gas_cap, stoiip, porosity, sw, ntg, bo, bg, goc_input, woc_input, stats)
+else:
+    st.info("Sensitivity analysis membutuhkan minimal 4 titik data.")
+
         # ===============================================
 
         # --- EXPORT LAPORAN VOLUMETRIK ---
@@ -572,13 +713,15 @@ col_exp1, col_exp2, col_exp3 = st.columns(3)
         
 with col_exp1:
             try:
-                pdf_buffer = create_volumetric_report_pdf(
+                # laporan dibuat saat tombol diklik, bukan tiap rerun
+                pdf_buffer = partial(
+                    create_volumetric_report_pdf,
                     vol_gas_cap, vol_oil_zone, vol_total_res,
                     goc_input, woc_input,
                     len(df),
-                    (df['X'].min(), df['X'].max()),
-                    (df['Y'].min(), df['Y'].max()),
-                    (df['Z'].min(), df['Z'].max())
+                    stats.rentang('X'),
+                    stats.rentang('Y'),
+                    stats.rentang('Z')
                 )
                 st.download_button(
                     label="📄 Download PDF Report",
@@ -591,14 +734,15 @@ with col_exp1:
         
 with col_exp2:
     try:
-        excel_buffer = create_volumetric_report_excel(
+        excel_buffer = partial(
+            create_volumetric_report_excel,
             vol_gas_cap, vol_oil_zone, vol_total_res,
             goc_input, woc_input,
             len(df),
-            (df['X'].min(), df['X'].max()),
-            (df['Y'].min(), df['Y'].max()),
-            (df['Z'].min(), df['Z'].max()),
-            df
+            stats.rentang('X'),
+            stats.rentang('Y'),
+            stats.rentang('Z'),
+            df.copy()
             )
         st.download_button(
             label="📊 Download Excel Report",
@@ -611,20 +755,17 @@ with col_exp2:
         
 with col_exp3:
     try:
-        grid_df = pd.DataFrame({
-            'X': grid_x.flatten(),
-            'Y': grid_y.flatten(),
-            'Z': grid_z.flatten()
-            })
-        grid_csv = grid_df.to_csv(index=False)
+        # Writer per potongan baris; file baru dibuat saat tombol diklik
+        format_grid = st.selectbox("Format Grid", list(FORMAT_GRID), key="format_grid")
+        ext_grid, mime_grid, _ = FORMAT_GRID[format_grid]
         st.download_button(
-            label="📥 Download Grid Data (CSV)",
-            data=grid_csv,
-            file_name=f"grid_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            mime="text/csv"
+            label="📥 Download Grid Data",
+            data=partial(grid_ke_bytes, format_grid, grid_z, surface.xs, surface.ys),
+            file_name=f"grid_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{ext_grid}",
+            mime=mime_grid
             )
     except Exception as e:
-            st.error(f"Error membuat CSV: {e}")
+            st.error(f"Error membuat file grid: {e}")
 
         # --- TABS VISUALISASI (5 TAB) ---
       # --- TABS VISUALISASI (5 TAB) ---
@@ -639,53 +780,14 @@ tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
 
 # pastikan ada minimal info untuk min_z / max_z (dipakai di beberapa tab)
 if not df.empty:
-    min_z, max_z = df['Z'].min(), df['Z'].max()
+    min_z, max_z = stats.rentang('Z')
 else:
     min_z, max_z = 0.0, 0.0
 
 # --- jika data cukup, jalankan perhitungan dan isi semua tab ---
 if len(df) >= 4:
-    # grid & interpolasi (siapkan aman dengan try/except)
-    df_unique = df.groupby(['X', 'Y'], as_index=False)['Z'].mean()
-    grid_x = np.linspace(df['X'].min(), df['X'].max(), 100)
-    grid_y = np.linspace(df['Y'].min(), df['Y'].max(), 100)
-    grid_x, grid_y = np.meshgrid(grid_x, grid_y)
-
-    try:
-        grid_z = griddata(
-            (df_unique['X'], df_unique['Y']),
-            df_unique['Z'],
-            (grid_x, grid_y),
-            method='cubic'
-        )
-    except Exception:
-        grid_z = griddata(
-            (df_unique['X'], df_unique['Y']),
-            df_unique['Z'],
-            (grid_x, grid_y),
-            method='linear'
-        )
-
-    # -- PERHITUNGAN VOLUME & CADANGAN (tetap di sini, karena cuma kalau data cukup) --
-    x_min, x_max = df['X'].min(), df['X'].max()
-    y_min, y_max = df['Y'].min(), df['Y'].max()
-    nx, ny = 100, 100
-    dx = (x_max - x_min) / (nx - 1) if nx > 1 else 1.0
-    dy = (y_max - y_min) / (ny - 1) if ny > 1 else 1.0
-    cell_area = dx * dy
-
-    thick_above_woc = woc_input - grid_z
-    thick_above_woc[thick_above_woc < 0] = 0
-    vol_total_res = np.nansum(thick_above_woc) * cell_area
-
-    thick_above_goc = goc_input - grid_z
-    thick_above_goc[thick_above_goc < 0] = 0
-    vol_gas_cap = np.nansum(thick_above_goc) * cell_area
-
-    vol_oil_zone = max(0, vol_total_res - vol_gas_cap)
-
-    stoiip = (vol_oil_zone * ntg * porosity * (1 - sw)) / bo
-    giip = (vol_gas_cap * ntg * porosity * (1 - sw)) / bg
+    # grid, volume & cadangan sudah dihitung di blok estimasi volume di atas
+    # (surface, grid_z, cell_area, vol_*, stoiip, giip) — tidak dihitung ulang
 
     # Metrics (bisa di atas tab atau di salah satu tab — saya tampilkan di atas tab1 untuk ringkasan)
     col_a, col_b, col_c = st.columns(3)
@@ -694,22 +796,39 @@ if len(df) >= 4:
     col_c.metric("🔵 Total Reservoir", f"{vol_total_res/1e6:.2f} Juta m³")
 
     # === TAB 1: 2D ===
-    with tab1:
-        fig_2d = go.Figure()
-        fig_2d.add_trace(go.Contour(
-            z=grid_z,
-            x=np.linspace(x_min, x_max, grid_z.shape[1]),
-            y=np.linspace(y_min, y_max, grid_z.shape[0]),
-            colorscale='Greys',
-            opacity=0.4,
-            contours=dict(
-                start=min_z,
-                end=max_z,
-                size=(max_z - min_z) / 10 if max_z != min_z else 1,
-                showlabels=True
-            ),
-            name='Structure'
-        ))
+    # tiap tab dibungkus st.fragment: rerun widget di dalam tab hanya menjalankan
+    # fragment tab itu (state lain dari run terakhir)
+    @st.fragment
+    def tab_peta_2d(grid_z, surface, df, min_z, max_z, goc_input, woc_input, poligon):
+        # Garis kontur dihitung di server (marching squares) & di-cache per grid + interval
+        interval_kontur = st.number_input(
+            "Interval Kontur (m)", min_value=0.0,
+            value=float((max_z - min_z) / 10 if max_z != min_z else 1),
+            key="interval_kontur"
+        )
+        interval_pakai = interval_efektif(min_z, max_z, interval_kontur)
+        if interval_pakai != interval_kontur:
+            st.warning(f"Interval {interval_kontur:.4g} m menghasilkan lebih dari {MAKS_LEVEL} level; "
+                       f"dipakai {interval_pakai:,.2f} m.")
+        kontur = hitung_kontur(grid_z, surface.xs, surface.ys,
+                               level_kontur(min_z, max_z, interval_kontur))
+
+        # Closure struktur & spill point (priority-flood), di-cache per grid
+        closure = analisis_closure(grid_z, surface.xs, surface.ys)
+        if closure is not None:
+            col_c1, col_c2, col_c3, col_c4 = st.columns(4)
+            col_c1.metric("⛰ Crest", f"{closure['crest'][2]:.1f} m")
+            col_c2.metric("💧 Spill Depth", f"{closure['spill'][2]:.1f} m")
+            col_c3.metric("📐 Luas Closure", f"{closure['luas']/1e6:.3f} km²")
+            col_c4.metric("🧱 GRV Max (fill-to-spill)", f"{closure['grv']/1e6:.2f} Juta m³")
+            if closure['luas'] == 0:
+                st.info("Crest berada di tepi grid/hull — tidak ada closure tertutup.")
+            elif woc_input > closure['spill'][2]:
+                st.warning(f"WOC ({woc_input:.1f} m) lebih dalam dari spill point "
+                           f"({closure['spill'][2]:.1f} m): kolom HC di bawah spill tidak tertahan trap.")
+
+        # Peta dasar (kontur, closure, poligon) dari cache; hanya titik fluida yang dibangun tiap rerun
+        fig_2d = figur_2d_dasar(kontur, closure, poligon, surface.xs, surface.ys)
 
         # point overlay colored by fluid
         conditions = [
@@ -725,137 +844,143 @@ if len(df) >= 4:
             subset = df[df['Fluid'] == fluid]
             if not subset.empty:
                 fig_2d.add_trace(go.Scatter(
-                    x=subset['X'],
-                    y=subset['Y'],
+                    x=subset['X'].to_numpy(),
+                    y=subset['Y'].to_numpy(),
                     mode='markers+text',
-                    text=subset['Z'].astype(int),
+                    text=subset['Z'].astype(int).to_numpy(),
                     textposition="top center",
                     marker=dict(size=10, color=colors_map[fluid], line=dict(width=1, color='black')),
                     name=fluid
                 ))
 
-        fig_2d.update_layout(height=650, margin=dict(l=20, r=20, t=40, b=20),
-                             xaxis_title="X Coordinate", yaxis_title="Y Coordinate")
-        st.plotly_chart(fig_2d, use_container_width=True)
+        # Box select pada peta dipakai sebagai viewport untuk zoom detail di bawah
+        event_2d = st.plotly_chart(fig_2d, use_container_width=True, key="peta_2d",
+                                   on_select="rerun", selection_mode="box")
 
-        # Export
-        try:
-            img_2d_png = fig_2d.to_image(format="png", width=1200, height=800)
-            st.download_button("🖼 Download PNG", data=img_2d_png,
-                               file_name=f"contour_2d_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png",
-                               mime="image/png")
-        except Exception:
-            st.info("Export PNG 2D tidak tersedia (butuh orca/kaleido terpasang).")
+        # Export: PNG dirender kaleido hanya saat diminta, bukan tiap rerun fragment
+        if st.button("🖼 Siapkan PNG", key="siapkan_png_2d"):
+            try:
+                img_2d_png = fig_2d.to_image(format="png", width=1200, height=800)
+                st.download_button("🖼 Download PNG", data=img_2d_png, on_click="ignore",
+                                   file_name=f"contour_2d_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png",
+                                   mime="image/png")
+            except Exception:
+                st.info("Export PNG 2D tidak tersedia (butuh orca/kaleido terpasang).")
+
+        st.download_button("🗺 Download Kontur (GeoJSON)", data=kontur_geojson(kontur),
+                           file_name=f"contour_2d_{datetime.now().strftime('%Y%m%d_%H%M%S')}.geojson",
+                           mime="application/geo+json")
+
+        # Zoom detail: gridding ulang resolusi tinggi hanya di sekitar viewport (tile di-cache)
+        st.markdown("#### 🔎 Zoom Detail (Refinement Lokal)")
+        viewport = viewport_dari_box(event_2d)
+        if viewport is None:
+            st.caption("Pilih area dengan **Box Select** pada peta di atas untuk menampilkan grid detail area tersebut.")
+        else:
+            resolusi_tile = st.select_slider("Resolusi Tile", options=[100, 200, 300, 500],
+                                             value=RESOLUSI_TILE, key="resolusi_tile")
+            xy_unik, z_unik = surface.titik_unik()
+            xs_t, ys_t, grid_t, n_tile = grid_tile(xy_unik, z_unik, viewport, resolusi_tile,
+                                                   method=surface.method)
+            fig_tile = go.Figure(go.Contour(
+                x=xs_t, y=ys_t, z=grid_t, colorscale='Viridis', reversescale=True,
+                contours=dict(showlabels=True), colorbar=dict(title="Z")
+            ))
+            di_viewport = df[df['X'].between(viewport[0], viewport[1]) & df['Y'].between(viewport[2], viewport[3])]
+            fig_tile.add_trace(go.Scatter(x=di_viewport['X'], y=di_viewport['Y'], mode='markers',
+                                          marker=dict(size=7, color='black'), name='Titik'))
+            fig_tile.update_layout(height=550, margin=dict(l=20, r=20, t=40, b=20),
+                                   xaxis_title="X Coordinate", yaxis_title="Y Coordinate",
+                                   title=f"Detail {resolusi_tile}x{resolusi_tile}")
+            st.plotly_chart(fig_tile, use_container_width=True)
+            st.caption(f"{n_tile} titik (viewport + margin) dipakai untuk tile ini; "
+                       f"grid global tetap {len(surface.xs)}x{len(surface.ys)}.")
+
+    with tab1:
+        tab_peta_2d(grid_z, surface, df, min_z, max_z, goc_input, woc_input, poligon)
 
     # === TAB 2: 3D ===
     # === TAB 2: 3D ===
-    with tab2:
+    @st.fragment
+    def tab_model_3d(grid_z, surface, df, min_z, goc_input, woc_input):
         st.subheader("🧊 Model 3D Reservoir & Sumur")
         
-        # 1. Inisialisasi Figure
-        fig_3d = go.Figure()
-
-        # 2. Plot Permukaan Struktur (Surface)
-        fig_3d.add_trace(go.Surface(
-            z=grid_z, 
-            x=grid_x, 
-            y=grid_y, 
-            colorscale='Earth_r', 
-            opacity=0.9, 
-            name='Structure'
-        ))
-
-        # 3. Fungsi Helper untuk Bidang Kontak Fluida
-        def create_plane(z_lvl, color, name):
-            return go.Surface(
-                z=z_lvl * np.ones_like(grid_z), 
-                x=grid_x, 
-                y=grid_y,
-                colorscale=[[0, color], [1, color]], 
-                opacity=0.4, 
-                showscale=False, 
-                name=name
-            )
-
-        # 4. Plot GOC dan WOC
-        fig_3d.add_trace(create_plane(goc_input, 'red', 'GOC'))
-        fig_3d.add_trace(create_plane(woc_input, 'blue', 'WOC'))
-
         # 5. --- FITUR BARU: VISUALISASI SUMUR (WELLS) ---
         # Menambahkan checkbox interaktif
         st.markdown("##### 🛤 Kontrol Visualisasi")
         show_wells = st.checkbox("Tampilkan Jalur Sumur (Wells)", value=True)
-        
-        if show_wells:
-            # Loop setiap titik data untuk membuat garis sumur
-            for index, row in df.iterrows():
-                # Menentukan titik atas sumur. 
-                # Kita pakai min_z (titik teratas struktur) agar skala visualnya pas.
-                well_top = min_z 
-                
-                # Gambar Garis Sumur (Pipa)
-                fig_3d.add_trace(go.Scatter3d(
-                    x=[row['X'], row['X']], 
-                    y=[row['Y'], row['Y']], 
-                    z=[well_top, row['Z']], # Dari atas struktur ke titik target
-                    mode='lines',
-                    line=dict(color='grey', width=3), # Warna abu-abu pipa
-                    name=f'Well-{index+1}',
-                    showlegend=False,
-                    hoverinfo='text',
-                    text=f"Well-{index+1}<br>X: {row['X']}<br>Y: {row['Y']}<br>Depth: {row['Z']}m"
-                ))
-                
-                # Gambar Marker (Titik Target) di ujung bawah
-                fig_3d.add_trace(go.Scatter3d(
-                    x=[row['X']], y=[row['Y']], z=[row['Z']],
-                    mode='markers',
-                    marker=dict(size=5, color='black', symbol='diamond'), # Ikon diamond biar keren
-                    showlegend=False,
-                    hoverinfo='skip'
-                ))
-        # -----------------------------------------------
-
-        # 6. Layout & Render
-        fig_3d.update_layout(
-            scene=dict(
-                xaxis_title='X (East)', 
-                yaxis_title='Y (North)', 
-                zaxis_title='Depth (TVD)', 
-                zaxis=dict(autorange="reversed") # Membalik sumbu Z agar kedalaman ke bawah
-            ),
-            height=650, 
-            margin=dict(l=0, r=0, b=0, t=0)
-        )
+
+        # Survey sumur berarah: lintasan minimum curvature semua sumur sekaligus
+        lintasan = tembus = None
+        with st.expander("🧭 Survey Sumur Berarah (MD, INC, AZI)"):
+            file_survei = st.file_uploader("Upload survey CSV (WELL, X, Y wellhead, MD, INC, AZI, opsional TOP_MD)",
+                                           type=["csv"], key="file_survei")
+            if file_survei is not None:
+                try:
+                    lintasan = lintasan_sumur(file_survei.getvalue())
+                except Exception as e:
+                    st.error(f"Gagal membaca survey: {e}")
+            if lintasan is not None:
+                tembus = potong_permukaan(lintasan, grid_z, surface.xs, surface.ys)
+                s1, s2, s3 = st.columns(3)
+                s1.metric("Sumur", len(lintasan['nama']))
+                s2.metric("Stasiun Survey", f"{len(lintasan['md']):,}")
+                s3.metric("Tembus Struktur", len(tembus))
+                st.caption("Titik tembus = perpotongan pertama lintasan dengan permukaan struktur saat ini.")
+                st.dataframe(tembus.round(2), use_container_width=True, hide_index=True, height=200)
+                st.download_button("⬇ Download Titik Tembus (CSV)", data=tembus.to_csv(index=False).encode(),
+                                   file_name="titik_tembus_sumur.csv", mime="text/csv")
+                pick = lintasan['pick']
+                if pick is not None and len(pick):
+                    st.caption(f"{len(pick)} sumur punya TOP_MD: posisi pick (X, Y, TVD) diambil dari lintasannya.")
+                    if st.button("➕ Tambahkan Pick TOP_MD ke Data Titik", key="tambah_pick"):
+                        st.session_state['data_points'].extend(pick[['X', 'Y', 'Z']].to_dict('records'))
+                        st.rerun()
+
+        # Permukaan + sumur (satu trace garis + satu trace marker) di-cache per grid & titik;
+        # GOC/WOC hanya mem-patch dua trace bidang kontak
+        sumur = df[['X', 'Y', 'Z']].to_numpy(dtype=float) if show_wells else None
+        if not show_wells:
+            lintasan = tembus = None
+        fig_3d = pasang_kontak_3d(figur_3d(grid_z, surface.xs, surface.ys, sumur, min_z, lintasan, tembus),
+                                  goc_input, woc_input)
         st.plotly_chart(fig_3d, use_container_width=True)
 
+    with tab2:
+        tab_model_3d(grid_z, surface, df, min_z, goc_input, woc_input)
+
     # === TAB 3: DATA MENTAH ===
     with tab3:
         st.dataframe(df, use_container_width=True)
-        csv_data = df.to_csv(index=False)
-        st.download_button("📥 Download CSV", data=csv_data,
+        st.download_button("📥 Download CSV", data=partial(df.copy().to_csv, index=False),
                            file_name=f"raw_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
                            mime="text/csv")
 
     # === TAB 4: CROSS SECTION ===
-    with tab4:
+    @st.fragment
+    def tab_penampang(xs, ys, grid_z, y_min, y_max, goc_input, woc_input):
         st.markdown("##### ✂ Penampang Melintang (Cross-Section)")
         st.caption("Geser slider untuk memotong peta dari Barat ke Timur pada posisi Y tertentu.")
         slice_y = st.slider("Pilih Posisi Irisan Y", float(y_min), float(y_max), float((y_min + y_max) / 2))
-        idx_y = (np.abs(grid_y[:, 0] - slice_y)).argmin()
+        idx_y = (np.abs(ys - slice_y)).argmin()
         z_profile = grid_z[idx_y, :]
         fig_xs = go.Figure()
-        fig_xs.add_trace(go.Scatter(x=grid_x[0, :], y=z_profile, mode='lines', fill='tozeroy', name='Top Structure'))
+        fig_xs.add_trace(go.Scatter(x=xs, y=z_profile, mode='lines', fill='tozeroy', name='Top Structure'))
         fig_xs.add_hline(y=goc_input, line_dash="dash", line_color="red", annotation_text="GOC")
         fig_xs.add_hline(y=woc_input, line_dash="dash", line_color="blue", annotation_text="WOC")
         fig_xs.update_yaxes(autorange="reversed", title="Depth (m)")
         fig_xs.update_layout(title=f"Irisan pada Y = {slice_y:.1f}", xaxis_title="X Coordinate", height=500)
         st.plotly_chart(fig_xs, use_container_width=True)
 
+    with tab4:
+        tab_penampang(surface.xs, surface.ys, grid_z, y_min, y_max, goc_input, woc_input)
+
     # === TAB 5: HEATMAP PROPERTY ===
-    with tab5:
+    @st.fragment
+    def tab_heatmap(df, surface, porosity, sw, ntg):
         st.subheader("🔥 Heatmap Interpolasi Properti")
-        st.markdown("Pilih properti yang ingin di-interpolasi (Porosity/Sw/NTG atau custom upload).")
+        st.markdown("Pilih properti yang ingin di-interpolasi (Porosity/Sw/NTG atau custom upload), "
+                    "atau atribut struktur (Dip, Dip Azimuth, Curvature) dari grid kedalaman.")
 
         # use petrophys params per-point (scalar sliders) -> expand to grid by repeating per-point
         df_prop = df.copy()
@@ -864,8 +989,11 @@ if len(df) >= 4:
         df_prop["Sw"] = sw
         df_prop["NTG"] = ntg
 
-        option = st.selectbox("Sumber properti:", ["Porosity", "Sw", "NTG", "Depth (Z)", "Upload CSV (kolom VALUE)"])
-        if option == "Upload CSV (kolom VALUE)":
+        option = st.selectbox("Sumber properti:", ["Porosity", "Sw", "NTG", "Depth (Z)", *ATRIBUT,
+                                                   "Upload CSV (kolom VALUE)"])
+        if option in ATRIBUT:
+            prop_values = None
+        elif option == "Upload CSV (kolom VALUE)":
             up = st.file_uploader("Upload CSV dengan kolom VALUE", type=["csv"])
             if up is not None:
                 prop_df = pd.read_csv(up)
@@ -882,33 +1010,36 @@ if len(df) >= 4:
             else:
                 prop_values = df_prop[option].values
 
-        if prop_values is None:
+        grid_prop = None
+        if option in ATRIBUT:
+            # atribut dihitung sekaligus dari grid_z (beda hingga) & di-cache per grid
+            grid_prop = atribut_struktur(surface.grid_z, surface.xs, surface.ys)[option]
+            fig_heat = figur_atribut(grid_prop, surface.xs, surface.ys, option)
+        elif prop_values is None:
             st.info("Belum ada property yang valid untuk di-interpolasi.")
         else:
-            try:
-                grid_prop = griddata((df["X"], df["Y"]), prop_values, (grid_x, grid_y), method='cubic')
-            except Exception:
-                grid_prop = griddata((df["X"], df["Y"]), prop_values, (grid_x, grid_y), method='linear')
-
-            fig_heat = go.Figure(data=go.Heatmap(
-                x=np.linspace(x_min, x_max, grid_prop.shape[1]),
-                y=np.linspace(y_min, y_max, grid_prop.shape[0]),
-                z=grid_prop,
-                colorscale="Viridis",
-                colorbar=dict(title=f"{option}")
-            ))
-            fig_heat.update_layout(height=650, xaxis_title="X", yaxis_title="Y", title=f"Heatmap {option} (Interpolated)")
+            # interpolasi + figure di-cache per titik & properti
+            grid_prop, fig_heat = figur_heatmap(df["X"].to_numpy(dtype=float), df["Y"].to_numpy(dtype=float),
+                                                np.asarray(prop_values, dtype=float),
+                                                surface.xs, surface.ys, option)
+
+        if grid_prop is not None:
             st.plotly_chart(fig_heat, use_container_width=True)
 
             # export
-            heat_df = pd.DataFrame({'X': grid_x.flatten(), 'Y': grid_y.flatten(), option: grid_prop.flatten()})
-            st.download_button(label=f"⬇ Download {option} Heatmap CSV",
-                               data=heat_df.to_csv(index=False),
-                               file_name=f"heatmap_{option.replace(' ','')}{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                               mime="text/csv")
+            format_heat = st.selectbox("Format Export", list(FORMAT_GRID), key="format_heat")
+            ext_heat, mime_heat, _ = FORMAT_GRID[format_heat]
+            st.download_button(label=f"⬇ Download {option} Heatmap",
+                               data=partial(grid_ke_bytes, format_heat, grid_prop, surface.xs, surface.ys, option),
+                               file_name=f"heatmap_{option.replace(' ','')}{datetime.now().strftime('%Y%m%d_%H%M%S')}.{ext_heat}",
+                               mime=mime_heat)
+
+    with tab5:
+        tab_heatmap(df, surface, porosity, sw, ntg)
             
       # === TAB 6: PERBANDINGAN 3D BEFORE–AFTER ===
-    with tab6:
+    @st.fragment
+    def tab_perbandingan():
         st.subheader("⭕ Perbandingan 3D Sebelum–Sesudah")
         st.info("Upload dua dataset untuk melihat perubahan struktur reservoir sebelum dan sesudah.")
 
@@ -918,66 +1049,14 @@ if len(df) >= 4:
         with colB:
             file_after = st.file_uploader("Upload Data After", type=["csv"])
 
-    # ===== CEK FILE =====
+        # ===== CEK FILE =====
         if file_before is None or file_after is None:
             st.warning("Silakan upload kedua file (Before & After) terlebih dahulu.")
-            st.stop()
-
-    # ===== BACA DATA =====
-        df_before = pd.read_csv(file_before)
-        df_after = pd.read_csv(file_after)
-
-        required = {"X", "Y", "Z"}
-        if not required.issubset(df_before.columns) or not required.issubset(df_after.columns):
-            st.error("CSV harus memiliki kolom: X, Y, Z.")
-            st.stop()
-
-    # ===== INTERPOLASI BEFORE =====
-        dfb = df_before.groupby(["X", "Y"], as_index=False)["Z"].mean()
-        xb, yb, zb = dfb["X"].values, dfb["Y"].values, dfb["Z"].values
-
-        gx_b, gy_b = np.meshgrid(
-            np.linspace(xb.min(), xb.max(), 100),
-            np.linspace(yb.min(), yb.max(), 100)
-        )
-        gz_b = griddata((xb, yb), zb, (gx_b, gy_b), method="linear")
-
-    # ===== INTERPOLASI AFTER =====
-        dfa = df_after.groupby(["X", "Y"], as_index=False)["Z"].mean()
-        xa, ya, za = dfa["X"].values, dfa["Y"].values, dfa["Z"].values
-
-        gx_a, gy_a = np.meshgrid(
-            np.linspace(xa.min(), xa.max(), 100),
-            np.linspace(ya.min(), ya.max(), 100)
-        )
-        gz_a = griddata((xa, ya), za, (gx_a, gy_a), method="linear")
-
-    # ===== PLOT BEFORE & AFTER =====
-        from plotly.subplots import make_subplots
-
-        fig = make_subplots(
-            rows=1, cols=2,
-            specs=[[{"type": "surface"}, {"type": "surface"}]],
-            subplot_titles=("Before", "After")
-        )
-
-        fig.add_trace(go.Surface(x=gx_b, y=gy_b, z=gz_b, colorscale="Viridis"), row=1, col=1)
-        fig.add_trace(go.Surface(x=gx_a, y=gy_a, z=gz_a, colorscale="Turbo"), row=1, col=2)
-
-        fig.update_layout(height=600, margin=dict(l=10, r=10, t=40, b=10))
-        st.plotly_chart(fig, use_container_width=True)
+        else:
+            tampilkan_perbandingan_3d(file_before, file_after)
 
-    # ===== SELISIH =====
-        st.subheader("📉 Selisih Elevasi (After – Before)")
-    try:
-            diff = gz_a - gz_b
-            fig_diff = go.Figure(go.Surface(
-            x=gx_a, y=gy_a, z=diff, colorscale="RdBu"
-            ))
-            fig_diff.update_layout(height=600, title="Perbedaan Elevasi")
-            st.plotly_chart(fig_diff, use_container_width=True)
-    except:
-            st.warning("Grid Before dan After tidak cocok ukurannya.")
+    with tab6:
+        tab_perbandingan()
 
   
 # --- jika data TIDAK cukup: tampilkan pesan di masing-masing tab (tab tetap ada) ---
@@ -1011,78 +1090,4 @@ from extra_features import run_extra_features
 
 tab_extra = st.tabs(["🧩 Fitur Ekstensi"])[0]
 with tab_extra:
-    run_extra_features(df)
-
-
-# ============================
-#  PERHITUNGAN VOLUME RESERVOIR
-# ============================
-
-st.subheader("📦 Perhitungan Volume Reservoir")
-
-# Input parameter volumetrik
-col_v1, col_v2, col_v3 = st.columns(3)
-
-phi = col_v1.number_input("Porosity (ϕ)", 0.0, 1.0, 0.20)
-sw  = col_v2.number_input("Water Saturation (Sw)", 0.0, 1.0, 0.30)
-ntg = col_v3.number_input("Net-to-Gross (NTG)", 0.0, 1.0, 0.80)
-
-# ============================
-#  AUTO DETECT KOLom X, Y, Z
-# ============================
-
-possible_x = ["X", "x", "Easting", "easting", "Long", "long", "Longitude", "longitude"]
-possible_y = ["Y", "y", "Northing", "northing", "Lat", "lat", "Latitude", "latitude"]
-possible_z = ["Z", "z", "Depth", "depth", "TVD", "tvd", "Elevation", "elevation"]
-
-col_x = next((c for c in possible_x if c in df.columns), None)
-col_y = next((c for c in possible_y if c in df.columns), None)
-col_z = next((c for c in possible_z if c in df.columns), None)
-
-if col_x is None or col_y is None:
-    st.error("❌ Tidak menemukan kolom X/Y di file CSV. Harus ada koordinat X dan Y.")
-    st.stop()
-
-# Thickness (Z)
-if col_z:
-    thickness = df[col_z]
-else:
-    thickness = st.number_input("Masukkan thickness (jika kolom Z tidak tersedia)", 
-                                0.0, 500.0, 50.0)
-
-# ============================
-#  PERHITUNGAN AREA
-# ============================
-
-xmin, xmax = df[col_x].min(), df[col_x].max()
-ymin, ymax = df[col_y].min(), df[col_y].max()
-area = (xmax - xmin) * (ymax - ymin)
-
-# Volume bulk reservoir
-bulk_volume = area * (thickness.mean() if hasattr(thickness, "mean") else thickness)
-
-# Net reservoir volume
-net_volume = bulk_volume * ntg
-
-# Pore volume
-pore_volume = net_volume * phi
-
-# Hydrocarbon pore volume
-hcpv = pore_volume * (1 - sw)
-
-# ============================
-#  DISPLAY HASIL
-# ============================
-
-st.write("### 📊 Hasil Perhitungan")
-
-col_r1, col_r2 = st.columns(2)
-
-col_r1.metric("Area (m²)", f"{area:,.2f}")
-col_r2.metric("Bulk Volume (m³)", f"{bulk_volume:,.2f}")
-
-col_r1.metric("Net Volume (m³)", f"{net_volume:,.2f}")
-col_r2.metric("Pore Volume (m³)", f"{pore_volume:,.2f}")
-
-st.metric("Hydrocarbon Pore Volume (HCPV)", f"{hcpv:,.2f} m³")
-
+    run_extra_features(df, stats)
@@ -0,0 +1,47 @@
+import numpy as np
+import streamlit as st
+
+# Atribut struktur -> (judul colorbar, colorscale)
+ATRIBUT = {
+    'Dip': ("Dip (°)", 'Viridis'),
+    'Dip Azimuth': ("Azimuth (°)", 'Twilight'),  # siklik: 0° = 360°
+    'Curvature': ("Curvature (1/m)", 'RdBu_r'),
+}
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def atribut_struktur(grid_z, xs, ys):
+    """Dip, dip azimuth dan mean curvature dari grid kedalaman (beda hingga vektor, float32).
+
+    Dip Azimuth = arah kemiringan ke bawah (kedalaman bertambah), searah
+    jarum jam dari utara. Curvature positif = antiklin / dome, negatif =
+    sinklin. Sel NaN (di luar hull) tetap NaN.
+    """
+    z = np.asarray(grid_z, dtype=np.float32)
+    dx = np.float32((xs[-1] - xs[0]) / (len(xs) - 1)) if len(xs) > 1 else np.float32(1)
+    dy = np.float32((ys[-1] - ys[0]) / (len(ys) - 1)) if len(ys) > 1 else np.float32(1)
+    zy, zx = np.gradient(z, dy, dx)
+    # operasi in-place float32: grid 4k x 4k cukup beberapa array sementara
+    miring2 = zx * zx
+    miring2 += zy * zy
+
+    dip = np.sqrt(miring2)
+    azimuth = np.arctan2(zx, zy)
+    azimuth[dip == 0] = np.nan  # bidang datar tidak punya arah
+    np.degrees(azimuth, out=azimuth)
+    np.add(azimuth, 360, out=azimuth, where=azimuth < 0)
+    np.arctan(dip, out=dip)
+    np.degrees(dip, out=dip)
+
+    zxy, zxx = np.gradient(zx, dy, dx)
+    zyy = np.gradient(zy, dy, axis=0)
+    # mean curvature permukaan z(x, y); z kedalaman -> dome (z minimum) bernilai positif
+    curvature = zxy
+    curvature *= -2 * zx * zy
+    zxx *= 1 + zy * zy
+    zyy *= 1 + zx * zx
+    curvature += zxx
+    curvature += zyy
+    miring2 += 1
+    curvature /= 2 * miring2 * np.sqrt(miring2)
+    return {'Dip': dip, 'Dip Azimuth': azimuth, 'Curvature': curvature}
@@ -0,0 +1,88 @@
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+from scipy import ndimage
+
+from kontur import segmen_kontur
+
+# Konektivitas 8 arah (spill bisa lewat diagonal sel)
+_STRUKTUR = np.ones((3, 3), dtype=bool)
+
+
+def _batas(grid_z):
+    """Sel valid di tepi grid atau bersebelahan dengan NaN (di luar hull)"""
+    valid = np.isfinite(grid_z)
+    batas = np.zeros_like(valid)
+    batas[0, :] = batas[-1, :] = batas[:, 0] = batas[:, -1] = True
+    batas |= ndimage.binary_dilation(~valid, structure=_STRUKTUR)
+    return batas & valid
+
+
+def _komponen_crest(dangkal, crest):
+    label, _ = ndimage.label(dangkal, structure=_STRUKTUR)
+    return label == label[crest]
+
+
+@st.cache_data(show_spinner=False)
+def analisis_closure(grid_z, xs, ys):
+    """Crest, spill point, luas closure dan GRV maksimum (fill-to-spill).
+
+    Setara priority-flood dari tepi grid: spill depth adalah level terkecil
+    di mana komponen {Z <= level} yang memuat crest menyentuh batas. Level
+    dicari dengan bisection pada kedalaman unik yang terurut (O(n log n)),
+    tiap langkah satu `ndimage.label` vektor, sehingga cepat untuk grid
+    jutaan sel.
+    """
+    valid = np.isfinite(grid_z)
+    if not valid.any():
+        return None
+    dx = (xs[-1] - xs[0]) / (len(xs) - 1) if len(xs) > 1 else 0.0
+    dy = (ys[-1] - ys[0]) / (len(ys) - 1) if len(ys) > 1 else 0.0
+    batas = _batas(grid_z)
+    crest = np.unravel_index(np.nanargmin(grid_z), grid_z.shape)
+    z = np.where(valid, grid_z, np.inf)
+
+    level = np.unique(grid_z[valid])
+    lo, hi = 0, len(level) - 1
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if (_komponen_crest(z <= level[mid], crest) & batas).any():
+            hi = mid
+        else:
+            lo = mid + 1
+    spill_z = level[lo]
+
+    closure = _komponen_crest(z < spill_z, crest) if spill_z > grid_z[crest] else np.zeros_like(valid)
+    # spill point = sel tepat di luar closure dengan kedalaman sama dengan spill depth
+    cincin = ndimage.binary_dilation(closure, structure=_STRUKTUR) & ~closure & valid
+    kandidat = np.flatnonzero(cincin.ravel() & (grid_z.ravel() == spill_z)) if closure.any() \
+        else np.array([np.ravel_multi_index(crest, grid_z.shape)])
+    spill = np.unravel_index(kandidat[0], grid_z.shape)
+
+    return {
+        'crest': (xs[crest[1]], ys[crest[0]], float(grid_z[crest])),
+        'spill': (xs[spill[1]], ys[spill[0]], float(spill_z)),
+        'luas': float(closure.sum() * dx * dy),
+        'grv': float((spill_z - grid_z[closure]).sum() * dx * dy),
+        'mask': closure,
+    }
+
+
+def trace_closure(hasil, xs, ys):
+    """Outline closure (fill-to-spill) + marker crest & spill point untuk peta 2D"""
+    seg = segmen_kontur(hasil['mask'].astype(float), xs, ys, 0.5)
+    traces = []
+    if len(seg):
+        xy = np.concatenate([seg, np.full((len(seg), 1, 2), np.nan)], axis=1).reshape(-1, 2)
+        traces.append(go.Scatter(
+            x=xy[:, 0], y=xy[:, 1], mode='lines',
+            line=dict(width=3, color='orange', dash='dash'),
+            name=f"Closure (spill {hasil['spill'][2]:.1f} m)"
+        ))
+    for label, (x, y, z), simbol in [('Crest', hasil['crest'], 'triangle-up'),
+                                     ('Spill Point', hasil['spill'], 'x')]:
+        traces.append(go.Scatter(
+            x=[x], y=[y], mode='markers', name=f"{label} ({z:.1f} m)",
+            marker=dict(size=14, color='orange', symbol=simbol, line=dict(width=1, color='black'))
+        ))
+    return traces
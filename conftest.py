@@ -0,0 +1 @@
+# conftest di root: pytest menambahkan folder ini ke sys.path sehingga modul app bisa diimpor dari tests/
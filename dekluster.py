@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from triangulasi import GRID_N
+
+# Pilihan agregasi Z per sel
+AGREGASI = ('mean', 'median', 'shallowest')
+
+
+def ukuran_sel_otomatis(x, y, n=GRID_N):
+    """Ukuran sel = jarak node grid struktur (titik hasil <= kira-kira n x n)"""
+    lebar = max(np.ptp(x), np.ptp(y))
+    return lebar / (n - 1) if lebar > 0 else 1.0
+
+
+def dekluster(x, y, z, sel, agregasi='mean'):
+    """Binning titik ke sel persegi berukuran `sel`, satu titik per sel terisi.
+
+    mean      : X, Y, Z rata-rata titik di sel
+    median    : X, Y rata-rata, Z median
+    shallowest: titik paling dangkal (Z terkecil) di sel, beserta X, Y aslinya
+    Semua operasi vektor (sort + reduceat), tanpa loop per sel.
+    Mengembalikan DataFrame X, Y, Z, N (jumlah titik asli per sel).
+    """
+    x, y, z = (np.asarray(a, dtype=float) for a in (x, y, z))
+    ix = np.floor((x - x.min()) / sel).astype(np.int64)
+    iy = np.floor((y - y.min()) / sel).astype(np.int64)
+    kunci = iy * (ix.max() + 1) + ix
+
+    # urut per sel (lalu Z untuk median/shallowest) -> tiap sel satu blok kontigu
+    urut = np.lexsort((z, kunci)) if agregasi != 'mean' else np.argsort(kunci, kind='stable')
+    kunci, x, y, z = kunci[urut], x[urut], y[urut], z[urut]
+    awal = np.flatnonzero(np.r_[True, kunci[1:] != kunci[:-1]])
+    n = np.diff(np.r_[awal, len(kunci)])
+
+    if agregasi == 'shallowest':
+        return pd.DataFrame({'X': x[awal], 'Y': y[awal], 'Z': z[awal], 'N': n})
+    hasil = {'X': np.add.reduceat(x, awal) / n, 'Y': np.add.reduceat(y, awal) / n}
+    if agregasi == 'median':
+        # Z sudah terurut dalam sel: median = rata-rata dua elemen tengah
+        bawah, atas = awal + (n - 1) // 2, awal + n // 2
+        hasil['Z'] = (z[bawah] + z[atas]) / 2
+    else:
+        hasil['Z'] = np.add.reduceat(z, awal) / n
+    hasil['N'] = n
+    return pd.DataFrame(hasil)
@@ -0,0 +1,115 @@
+import io
+import struct
+
+import numpy as np
+from scipy.interpolate import RegularGridInterpolator
+
+# Jumlah baris/kolom grid yang diformat per potongan (membatasi memori puncak)
+BARIS_PER_CHUNK = 256
+
+NODATA_ASC = -9999.0
+NODATA_ZMAP = -99999.0
+BLANK_SURFER = 1.70141e38
+
+
+def _f(v):
+    return repr(float(v))
+
+
+def _inkremen(xs, ys):
+    dx = (xs[-1] - xs[0]) / (len(xs) - 1) if len(xs) > 1 else 1.0
+    dy = (ys[-1] - ys[0]) / (len(ys) - 1) if len(ys) > 1 else 1.0
+    return dx, dy
+
+
+def tulis_esri_ascii(f, z, xs, ys, nama='Z'):
+    """ESRI ASCII Grid (node = pusat sel), baris dari utara ke selatan.
+
+    Format ESRI hanya mengenal sel persegi (satu `cellsize`); grid dengan
+    dx != dy di-resample bilinear ke sel persegi = inkremen terkecil.
+    """
+    dx, dy = _inkremen(xs, ys)
+    if not np.isclose(dx, dy):
+        sel = min(abs(dx), abs(dy))
+        interp = RegularGridInterpolator((ys, xs), z, bounds_error=False, fill_value=np.nan)
+        xs = xs[0] + sel * np.arange(int(np.floor((xs[-1] - xs[0]) / sel + 1e-9)) + 1)
+        ys = ys[0] + sel * np.arange(int(np.floor((ys[-1] - ys[0]) / sel + 1e-9)) + 1)
+    else:
+        sel, interp = dx, None
+    header = (f"ncols {len(xs)}\nnrows {len(ys)}\nxllcenter {_f(xs[0])}\nyllcenter {_f(ys[0])}\n"
+              f"cellsize {_f(sel)}\nNODATA_value {NODATA_ASC:g}\n")
+    f.write(header.encode())
+    for akhir in range(len(ys), 0, -BARIS_PER_CHUNK):
+        awal = max(akhir - BARIS_PER_CHUNK, 0)
+        if interp is None:
+            blok = z[awal:akhir]
+        else:
+            gy, gx = np.meshgrid(ys[awal:akhir], xs, indexing='ij')
+            blok = interp((gy, gx))
+        blok = blok[::-1]
+        np.savetxt(f, np.where(np.isfinite(blok), blok, NODATA_ASC), fmt='%.4f')
+
+
+def tulis_zmap(f, z, xs, ys, nama='Z'):
+    """ZMAP+ grid: per kolom (barat -> timur), nilai dari utara ke selatan, 5 per baris"""
+    nrow, ncol = len(ys), len(xs)
+    nama = nama.replace(",", " ")
+    header = (f"! Grid {nama}\n"
+              f"@{nama} HEADER, GRID, 5\n"
+              f"15, {NODATA_ZMAP:.1f}, , 4, 1\n"
+              f"{nrow}, {ncol}, {_f(xs[0])}, {_f(xs[-1])}, {_f(ys[0])}, {_f(ys[-1])}\n"
+              f"0.0, 0.0, 0.0\n@\n")
+    f.write(header.encode())
+    n5 = nrow - nrow % 5
+    for awal in range(0, ncol, BARIS_PER_CHUNK):
+        blok = z[::-1, awal:awal + BARIS_PER_CHUNK]
+        blok = np.where(np.isfinite(blok), blok, NODATA_ZMAP)
+        for kolom in blok.T:
+            if n5:
+                np.savetxt(f, kolom[:n5].reshape(-1, 5), fmt='%15.4f', delimiter='')
+            if n5 < nrow:
+                np.savetxt(f, kolom[n5:][None, :], fmt='%15.4f', delimiter='')
+
+
+def tulis_surfer_bin(f, z, xs, ys, nama='Z'):
+    """Surfer 6 binary grid (DSBB): header 56 byte + float32, baris selatan -> utara"""
+    zmin, zmax = (float(np.nanmin(z)), float(np.nanmax(z))) if np.isfinite(z).any() else (0.0, 0.0)
+    f.write(struct.pack('<4shhdddddd', b'DSBB', len(xs), len(ys),
+                        xs[0], xs[-1], ys[0], ys[-1], zmin, zmax))
+    for awal in range(0, len(ys), BARIS_PER_CHUNK):
+        blok = z[awal:awal + BARIS_PER_CHUNK]
+        f.write(np.where(np.isfinite(blok), blok, BLANK_SURFER).astype('<f4').tobytes())
+
+
+def tulis_npz(f, z, xs, ys, nama='Z'):
+    """NumPy .npz: grid float32 + origin & inkremen mesh (tanpa X/Y per sel)"""
+    np.savez(f, z=np.asarray(z, dtype=np.float32),
+             origin=np.array([xs[0], ys[0]]), increment=np.array(_inkremen(xs, ys)),
+             shape=np.array(z.shape))
+
+
+def tulis_csv(f, z, xs, ys, nama='Z'):
+    """CSV X,Y,<nama> per node (format lama), ditulis per potongan baris"""
+    f.write(f"X,Y,{nama}\n".encode())
+    for awal in range(0, len(ys), BARIS_PER_CHUNK):
+        blok = z[awal:awal + BARIS_PER_CHUNK]
+        gy = np.repeat(ys[awal:awal + BARIS_PER_CHUNK], len(xs))
+        gx = np.tile(xs, len(blok))
+        np.savetxt(f, np.column_stack([gx, gy, blok.ravel()]), fmt='%.6f', delimiter=',')
+
+
+# label -> (ekstensi, mime, writer)
+FORMAT_GRID = {
+    "ESRI ASCII Grid (.asc)": ("asc", "text/plain", tulis_esri_ascii),
+    "ZMAP+ (.zmap)": ("zmap", "text/plain", tulis_zmap),
+    "Surfer 6 Binary float32 (.grd)": ("grd", "application/octet-stream", tulis_surfer_bin),
+    "NumPy float32 + origin/inkremen (.npz)": ("npz", "application/octet-stream", tulis_npz),
+    "CSV X,Y,Z (.csv)": ("csv", "text/csv", tulis_csv),
+}
+
+
+def grid_ke_bytes(format_label, z, xs, ys, nama='Z'):
+    """Jalankan writer format terpilih ke buffer memori"""
+    buffer = io.BytesIO()
+    FORMAT_GRID[format_label][2](buffer, z, xs, ys, nama)
+    return buffer.getvalue()
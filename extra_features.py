@@ -1,9 +1,54 @@
 # extra_features.py
 
+import numpy as np
 import streamlit as st
 import pandas as pd
+import plotly.graph_objects as go
 
-def run_extra_features(df):
+from statistik import StatistikStreaming
+from qc_spasial import qc_spasial, bersihkan_qc, TOLERANSI_DEKAT, K_TETANGGA, AMBANG_SPIKE
+from validasi_silang import validasi_silang, METODE_CV
+from dekluster import dekluster, ukuran_sel_otomatis, AGREGASI
+
+
+@st.cache_data(show_spinner=False)
+def hitung_qc(df, toleransi, k, ambang):
+    """QC spasial ter-cache per dataset & parameter"""
+    return qc_spasial(df['X'], df['Y'], df['Z'], toleransi, k, ambang)
+
+
+@st.cache_data(show_spinner=False)
+def hitung_dekluster(df, sel, agregasi):
+    """Declustering ter-cache per dataset & parameter"""
+    return dekluster(df['X'], df['Y'], df['Z'], sel, agregasi)
+
+
+def sel_dekluster(df):
+    """Ukuran sel declustering dari input (0 = otomatis, jarak node grid struktur)"""
+    sel = st.session_state.get('dekluster_sel', 0.0)
+    return sel if sel > 0 else ukuran_sel_otomatis(df['X'], df['Y'])
+
+
+def data_untuk_gridding(df):
+    """Titik yang dipakai gridding (sudah difilter QC / di-dekluster kalau opsi aktif)"""
+    if df.empty:
+        return df
+    if st.session_state.get('qc_filter', False):
+        hasil = hitung_qc(df[['X', 'Y', 'Z']],
+                          st.session_state.get('qc_toleransi', TOLERANSI_DEKAT),
+                          st.session_state.get('qc_k', K_TETANGGA),
+                          st.session_state.get('qc_ambang', AMBANG_SPIKE))
+        df = bersihkan_qc(df, hasil)
+    if st.session_state.get('dekluster', False):
+        tipis = hitung_dekluster(df[['X', 'Y', 'Z']], sel_dekluster(df),
+                                 st.session_state.get('dekluster_agregasi', 'mean'))
+        # sel terlalu besar -> terlalu sedikit titik untuk triangulasi, pakai data asli
+        if len(tipis) >= 4:
+            df = tipis[['X', 'Y', 'Z']]
+    return df
+
+
+def run_extra_features(df, stats=None):
     st.header("🧩 Fitur Ekstensi")
     st.caption("Fitur tambahan yang berdiri di luar kode utama (modular & non-intrusif).")
 
@@ -11,20 +56,117 @@ def run_extra_features(df):
         st.info("Data belum tersedia.")
         return
 
+    # Statistik satu-pass dari app (fallback: hitung dari df)
+    if stats is None:
+        stats = StatistikStreaming()
+        stats.tambah(df[['X', 'Y', 'Z']].to_numpy(dtype=float))
+    summary = stats.describe()
+
     st.subheader("📈 Statistik Dasar")
-    st.dataframe(df.describe(), use_container_width=True)
+    st.dataframe(summary, use_container_width=True)
 
     st.subheader("🧭 Cek Sebaran Koordinat")
-    st.write(f"Rentang X: {df['X'].min()} — {df['X'].max()}")
-    st.write(f"Rentang Y: {df['Y'].min()} — {df['Y'].max()}")
-    st.write(f"Rentang Z: {df['Z'].min()} — {df['Z'].max()}")
+    for kolom in ['X', 'Y', 'Z']:
+        lo, hi = stats.rentang(kolom)
+        st.write(f"Rentang {kolom}: {lo:,.2f} — {hi:,.2f}")
+
+    st.subheader("🔍 QC Spasial (Duplikat & Spike)")
+    st.caption("Cari sumur duplikat / hampir sama dan spike kedalaman terhadap tetangga terdekat (KD-tree).")
+    q1, q2, q3 = st.columns(3)
+    toleransi = q1.number_input("Toleransi duplikat dekat", 0.0, value=TOLERANSI_DEKAT, key="qc_toleransi")
+    k = q2.number_input("Jumlah tetangga (k)", 3, 64, K_TETANGGA, key="qc_k")
+    ambang = q3.number_input("Ambang spike (robust z)", 1.0, 20.0, AMBANG_SPIKE, key="qc_ambang")
+
+    hasil = hitung_qc(df[['X', 'Y', 'Z']], toleransi, k, ambang)
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Duplikat persis", int(hasil['QC_DUPLIKAT'].sum()))
+    c2.metric("Duplikat dekat", int(hasil['QC_DEKAT'].sum()))
+    c3.metric("Spike kedalaman", int(hasil['QC_SPIKE'].sum()))
+
+    # duplikat persis tidak ikut QC_DEKAT (pasangan XY identik dibuang), jadi disertakan sendiri
+    bermasalah = hasil['QC_DUPLIKAT'] | hasil['QC_DEKAT'] | hasil['QC_SPIKE']
+    if bermasalah.any():
+        laporan_qc = pd.concat([df[['X', 'Y', 'Z']].reset_index(drop=True), hasil], axis=1)[bermasalah.values]
+        st.dataframe(laporan_qc, use_container_width=True)
+        st.download_button(
+            "📥 Download Laporan QC",
+            data=laporan_qc.to_csv(index=False).encode("utf-8"),
+            file_name="qc_spasial.csv",
+            mime="text/csv"
+        )
+    else:
+        st.success("Tidak ada duplikat atau spike yang terdeteksi.")
+
+    st.checkbox("Terapkan filter QC sebelum gridding (buang spike, gabung duplikat dekat)", key="qc_filter")
+
+    st.subheader("🧹 Declustering / Thinning")
+    st.caption("Titik padat (mis. pick seismik) digabung per sel persegi sebelum triangulasi, "
+               "sehingga biaya gridding mengikuti resolusi peta, bukan jumlah pick.")
+    d1, d2 = st.columns(2)
+    d1.number_input("Ukuran sel (0 = otomatis, jarak node grid)", 0.0, value=0.0, key="dekluster_sel")
+    agregasi = d2.selectbox("Agregasi Z per sel", AGREGASI, key="dekluster_agregasi",
+                            format_func={'mean': "Rata-rata", 'median': "Median",
+                                         'shallowest': "Paling dangkal"}.get)
+    sel = sel_dekluster(df)
+    tipis = hitung_dekluster(df[['X', 'Y', 'Z']], sel, agregasi)
+    e1, e2, e3 = st.columns(3)
+    e1.metric("Ukuran Sel", f"{sel:,.2f} m")
+    e2.metric("Titik Asli", len(df))
+    e3.metric("Setelah Declustering", len(tipis), f"{len(tipis) / len(df) * 100 - 100:.0f}%", delta_color="off")
+    st.checkbox("Terapkan declustering sebelum gridding", key="dekluster")
+
+    tampilkan_validasi_silang(df)
 
     st.subheader("🗂 Download Summary")
-    summary_csv = df.describe().to_csv().encode("utf-8")
+    summary_csv = summary.to_csv().encode("utf-8")
     st.download_button(
         "📥 Download CSV Statistik",
         data=summary_csv,
         file_name="summary_stats.csv",
         mime="text/csv"
     )
-        
+
+
+def tampilkan_validasi_silang(df):
+    st.subheader("🎯 Validasi Silang Metode Gridding")
+    st.caption("Setiap sumur diprediksi tanpa dirinya sendiri (leave-one-out / k-fold) untuk tiap metode; "
+               "fold dibagi ke beberapa proses. Residual = prediksi - aktual.")
+    if len(df) < 10:
+        st.info("Validasi silang membutuhkan minimal 10 titik.")
+        return
+
+    v1, v2, v3 = st.columns(3)
+    mode = v1.radio("Mode", ["k-fold", "Leave-one-out"], horizontal=True, key="cv_mode")
+    k_fold = v2.number_input("Jumlah fold (k)", 2, 20, 5, key="cv_k", disabled=mode != "k-fold")
+    metode = v3.multiselect("Metode", list(METODE_CV), default=list(METODE_CV), key="cv_metode")
+    # hasil dipertahankan antar rerun (perhitungannya sendiri di-cache)
+    if st.button("🚀 Jalankan Validasi Silang", key="cv_jalan", disabled=not metode):
+        st.session_state['cv_param'] = ('loo' if mode == "Leave-one-out" else 'kfold', int(k_fold), tuple(metode))
+    if 'cv_param' not in st.session_state:
+        return
+
+    mode_cv, k_cv, metode_cv = st.session_state['cv_param']
+    with st.spinner("Menjalankan validasi silang..."):
+        ringkasan, residual = validasi_silang(df[['X', 'Y', 'Z']], metode_cv, mode_cv, k_cv)
+    st.dataframe(ringkasan.round(4), use_container_width=True, hide_index=True)
+    st.caption(f"Metode terbaik (RMSE terkecil): **{ringkasan['Metode'].iloc[0]}**. "
+               "Titik di luar hull tidak bisa diprediksi metode linear/cubic (tidak dihitung).")
+
+    pilih = st.selectbox("Peta residual metode", list(ringkasan['Metode']), key="cv_peta")
+    r = residual[f'RESIDUAL_{pilih.upper()}']
+    batas = float(np.nanpercentile(np.abs(r), 98)) if r.notna().any() else 1.0
+    fig = go.Figure(go.Scattergl(
+        x=residual['X'], y=residual['Y'], mode='markers',
+        marker=dict(size=6, color=r, colorscale='RdBu_r', cmin=-batas, cmax=batas,
+                    colorbar=dict(title="Residual (m)")),
+        customdata=r, hovertemplate="X: %{x}<br>Y: %{y}<br>Residual: %{customdata:.2f} m<extra></extra>"
+    ))
+    fig.update_layout(height=550, xaxis_title="X", yaxis_title="Y",
+                      title=f"Residual Validasi Silang — {pilih} ({'LOO' if mode_cv == 'loo' else f'{k_cv}-fold'})")
+    st.plotly_chart(fig, use_container_width=True)
+    st.download_button(
+        "📥 Download Residual Validasi Silang",
+        data=residual.to_csv(index=False).encode("utf-8"),
+        file_name="residual_validasi_silang.csv",
+        mime="text/csv"
+    )
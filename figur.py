@@ -0,0 +1,192 @@
+import io
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+from plotly.subplots import make_subplots
+from scipy.interpolate import griddata
+
+from atribut import ATRIBUT
+from closure import trace_closure
+from kompartemen import trace_poligon
+from kontur import trace_kontur
+
+# Figure di-cache per hash input (st.cache_data); yang bergantung ke widget
+# ringan (kontak fluida) dipasang/di-patch setelahnya. Semua array dikirim
+# sebagai numpy sehingga Plotly men-serialisasi ke base64 typed array.
+
+# Indeks trace tetap di figure 3D (dipakai saat patch kontak)
+TRACE_GOC, TRACE_WOC = 1, 2
+
+
+def trace_sumur(sumur, top):
+    """Semua sumur vertikal sebagai 2 trace (garis dipisah NaN + marker target)"""
+    n = len(sumur)
+    nomor = np.arange(1, n + 1, dtype=float)
+    x = np.column_stack([sumur[:, 0], sumur[:, 0], np.full(n, np.nan)]).ravel()
+    y = np.column_stack([sumur[:, 1], sumur[:, 1], np.full(n, np.nan)]).ravel()
+    z = np.column_stack([np.full(n, top), sumur[:, 2], np.full(n, np.nan)]).ravel()
+    info = np.repeat(np.column_stack([nomor, sumur[:, 2]]), 3, axis=0)
+    return [
+        go.Scatter3d(
+            x=x, y=y, z=z, mode='lines', line=dict(color='grey', width=3),
+            name='Wells', showlegend=False, customdata=info,
+            hovertemplate="Well-%{customdata[0]}<br>X: %{x}<br>Y: %{y}<br>Depth: %{customdata[1]}m<extra></extra>"
+        ),
+        go.Scatter3d(
+            x=sumur[:, 0], y=sumur[:, 1], z=sumur[:, 2], mode='markers',
+            marker=dict(size=5, color='black', symbol='diamond'),
+            showlegend=False, hoverinfo='skip'
+        ),
+    ]
+
+
+def trace_lintasan(lintasan, tembus=None):
+    """Semua lintasan survey sebagai 1 trace garis (sumur dipisah NaN) + marker titik tembus"""
+    sumur = lintasan['sumur']
+    # sisip NaN di awal tiap sumur (kecuali yang pertama) -> satu trace untuk semua sumur
+    pisah = np.flatnonzero(sumur[1:] != sumur[:-1]) + 1
+    x, y, z, md, idx = (np.insert(np.asarray(lintasan[k], dtype=float), pisah, np.nan)
+                        for k in ('x', 'y', 'tvd', 'md', 'sumur'))
+    # TVD & hover float32 (X/Y tetap float64: koordinat UTM besar)
+    traces = [go.Scatter3d(
+        x=x, y=y, z=z.astype(np.float32), mode='lines', line=dict(color='dimgrey', width=3),
+        name='Lintasan Sumur', showlegend=False,
+        customdata=np.column_stack([idx + 1, md]).astype(np.float32),
+        hovertemplate="Sumur #%{customdata[0]}<br>MD: %{customdata[1]:.1f} m<br>TVD: %{z:.1f} m<extra></extra>"
+    )]
+    if tembus is not None and len(tembus):
+        traces.append(go.Scatter3d(
+            x=tembus['X'].to_numpy(), y=tembus['Y'].to_numpy(), z=tembus['Z'].to_numpy(),
+            mode='markers', marker=dict(size=5, color='black', symbol='diamond'),
+            text=tembus['WELL'].to_numpy(), showlegend=False,
+            hovertemplate="%{text}<br>Tembus struktur<br>X: %{x}<br>Y: %{y}<br>TVD: %{z:.1f} m<extra></extra>"
+        ))
+    return traces
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def figur_3d(grid_z, xs, ys, sumur=None, top=None, lintasan=None, tembus=None):
+    """Permukaan struktur + bidang GOC/WOC (placeholder) + sumur, di-cache per grid & titik.
+
+    Kalau `lintasan` survey diberikan, sumur digambar sesuai lintasannya
+    (bukan garis vertikal dari `top`).
+    """
+    fig = go.Figure()
+    # sumbu 1-D + float32: payload jauh lebih kecil dari meshgrid float64
+    fig.add_trace(go.Surface(z=grid_z.astype(np.float32), x=xs, y=ys,
+                             colorscale='Earth_r', opacity=0.9, name='Structure'))
+    # bidang kontak cukup 2x2 node (datar); nilai Z dipasang oleh `pasang_kontak_3d`
+    for color, name in (('red', 'GOC'), ('blue', 'WOC')):
+        fig.add_trace(go.Surface(z=np.zeros((2, 2)), x=xs[[0, -1]], y=ys[[0, -1]],
+                                 colorscale=[[0, color], [1, color]], opacity=0.4,
+                                 showscale=False, name=name))
+    if lintasan is not None:
+        fig.add_traces(trace_lintasan(lintasan, tembus))
+    elif sumur is not None and len(sumur):
+        fig.add_traces(trace_sumur(sumur, top))
+    fig.update_layout(
+        scene=dict(
+            xaxis_title='X (East)',
+            yaxis_title='Y (North)',
+            zaxis_title='Depth (TVD)',
+            zaxis=dict(autorange="reversed")  # Membalik sumbu Z agar kedalaman ke bawah
+        ),
+        height=650,
+        margin=dict(l=0, r=0, b=0, t=0)
+    )
+    return fig
+
+
+def pasang_kontak_3d(fig, goc, woc):
+    """Patch hanya trace bidang kontak (figure lain tetap dari cache)"""
+    fig.data[TRACE_GOC].z = np.full((2, 2), goc)
+    fig.data[TRACE_WOC].z = np.full((2, 2), woc)
+    return fig
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def figur_2d_dasar(kontur, closure, poligon, xs, ys):
+    """Peta 2D tanpa titik berwarna fluida: kontur, closure, poligon kompartemen"""
+    fig = go.Figure()
+    fig.add_traces(trace_kontur(kontur))
+    if closure is not None:
+        fig.add_traces(trace_closure(closure, xs, ys))
+    fig.add_traces(trace_poligon(poligon))
+    fig.update_layout(height=650, margin=dict(l=20, r=20, t=40, b=20),
+                      xaxis_title="X Coordinate", yaxis_title="Y Coordinate")
+    return fig
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def figur_heatmap(x, y, nilai, xs, ys, option):
+    """Interpolasi properti ke grid + heatmap-nya, di-cache per titik & properti"""
+    gx, gy = np.meshgrid(xs, ys)
+    try:
+        grid_prop = griddata((x, y), nilai, (gx, gy), method='cubic')
+    except Exception:
+        grid_prop = griddata((x, y), nilai, (gx, gy), method='linear')
+
+    fig = go.Figure(data=go.Heatmap(
+        x=xs, y=ys, z=grid_prop.astype(np.float32),
+        colorscale="Viridis",
+        colorbar=dict(title=f"{option}")
+    ))
+    fig.update_layout(height=650, xaxis_title="X", yaxis_title="Y", title=f"Heatmap {option} (Interpolated)")
+    return grid_prop, fig
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def figur_atribut(grid, xs, ys, nama):
+    """Heatmap atribut struktur (dip / azimuth / curvature) langsung dari grid"""
+    judul, skala = ATRIBUT[nama]
+    # curvature: warna simetris di sekitar 0 (antiklin merah, sinklin biru), outlier 2% dipotong
+    batas = float(np.nanpercentile(np.abs(grid), 98)) if nama == 'Curvature' and np.isfinite(grid).any() else None
+    fig = go.Figure(data=go.Heatmap(
+        x=xs, y=ys, z=np.asarray(grid, dtype=np.float32),
+        colorscale=skala, colorbar=dict(title=judul),
+        zmid=0 if batas else None, zmin=-batas if batas else None, zmax=batas if batas else None
+    ))
+    fig.update_layout(height=650, xaxis_title="X", yaxis_title="Y", title=f"Atribut Struktur: {judul}")
+    return fig
+
+
+def _grid_csv(df):
+    d = df.groupby(["X", "Y"], as_index=False)["Z"].mean()
+    x, y, z = d["X"].values, d["Y"].values, d["Z"].values
+    xs = np.linspace(x.min(), x.max(), 100)
+    ys = np.linspace(y.min(), y.max(), 100)
+    gx, gy = np.meshgrid(xs, ys)
+    return xs, ys, griddata((x, y), z, (gx, gy), method="linear")
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def figur_perbandingan(data_before, data_after):
+    """(fig before/after, fig selisih, pesan error) dari dua file CSV, di-cache per isi file"""
+    df_before = pd.read_csv(io.BytesIO(data_before))
+    df_after = pd.read_csv(io.BytesIO(data_after))
+
+    required = {"X", "Y", "Z"}
+    if not required.issubset(df_before.columns) or not required.issubset(df_after.columns):
+        return None, None, "CSV harus memiliki kolom: X, Y, Z."
+
+    xs_b, ys_b, gz_b = _grid_csv(df_before)
+    xs_a, ys_a, gz_a = _grid_csv(df_after)
+
+    fig = make_subplots(
+        rows=1, cols=2,
+        specs=[[{"type": "surface"}, {"type": "surface"}]],
+        subplot_titles=("Before", "After")
+    )
+    fig.add_trace(go.Surface(x=xs_b, y=ys_b, z=gz_b, colorscale="Viridis"), row=1, col=1)
+    fig.add_trace(go.Surface(x=xs_a, y=ys_a, z=gz_a, colorscale="Turbo"), row=1, col=2)
+    fig.update_layout(height=600, margin=dict(l=10, r=10, t=40, b=10))
+
+    try:
+        diff = gz_a - gz_b
+        fig_diff = go.Figure(go.Surface(x=xs_a, y=ys_a, z=diff, colorscale="RdBu"))
+        fig_diff.update_layout(height=600, title="Perbedaan Elevasi")
+    except Exception:
+        fig_diff = None
+    return fig, fig_diff, None
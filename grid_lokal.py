@@ -0,0 +1,61 @@
+import numpy as np
+import streamlit as st
+from scipy.interpolate import CloughTocher2DInterpolator, LinearNDInterpolator
+from scipy.spatial import cKDTree
+
+# Margin data di sekitar viewport (fraksi ukuran viewport) agar tepi tile mulus
+MARGIN_VIEWPORT = 0.25
+
+# Minimal titik data untuk satu tile; margin diperlebar sampai terpenuhi
+# (sama dengan K_LOKAL cubic: gradien Clough-Tocher butuh tetangga yang cukup)
+MIN_TITIK_TILE = 256
+
+RESOLUSI_TILE = 200
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _index_titik(xy):
+    """cKDTree titik unik, dibangun sekali per set titik"""
+    return cKDTree(xy)
+
+
+def viewport_dari_box(event):
+    """Bounding box (x0, x1, y0, y1) dari box-select `st.plotly_chart`, atau None"""
+    box = ((event or {}).get('selection') or {}).get('box') or []
+    if not box:
+        return None
+    x, y = box[-1].get('x') or [], box[-1].get('y') or []
+    if len(x) < 2 or len(y) < 2 or min(x) == max(x) or min(y) == max(y):
+        return None
+    return float(min(x)), float(max(x)), float(min(y)), float(max(y))
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def grid_tile(xy, z, viewport, n=RESOLUSI_TILE, margin=MARGIN_VIEWPORT, method='cubic'):
+    """Gridding ulang resolusi tinggi hanya untuk viewport, di-cache per region.
+
+    Titik dipilih lewat index spasial (lingkaran yang memuat viewport +
+    margin), jadi biaya tergantung kepadatan data lokal, bukan ukuran
+    lapangan. Hasil: (xs, ys, grid_z, jumlah_titik_dipakai).
+    """
+    x0, x1, y0, y1 = viewport
+    pusat = np.array([(x0 + x1) / 2, (y0 + y1) / 2])
+    radius = np.hypot(x1 - x0, y1 - y0) / 2 * (1 + 2 * margin)
+    tree = _index_titik(xy)
+    k = min(MIN_TITIK_TILE, len(xy))
+    # pastikan cukup titik untuk triangulasi (data jarang / viewport kecil)
+    radius = max(radius, float(np.max(tree.query(pusat, k=k)[0])) * 1.01)
+    idx = tree.query_ball_point(pusat, radius, return_sorted=True)
+
+    xs = np.linspace(x0, x1, n)
+    ys = np.linspace(y0, y1, n)
+    gx, gy = np.meshgrid(xs, ys)
+    interp = None
+    if method == 'cubic':
+        try:
+            interp = CloughTocher2DInterpolator(xy[idx], z[idx])
+        except Exception:
+            interp = None
+    if interp is None:
+        interp = LinearNDInterpolator(xy[idx], z[idx])
+    return xs, ys, interp(gx, gy), len(idx)
@@ -0,0 +1,106 @@
+import io
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Jumlah baris Excel yang dikonversi & dimasukkan ke data_points per potongan
+CHUNK_BARIS = 50_000
+
+
+def engine_cepat():
+    """'calamine' (Rust) kalau python-calamine terpasang, selain itu None (openpyxl read-only)"""
+    try:
+        import python_calamine  # noqa: F401
+        return 'calamine'
+    except ImportError:
+        return None
+
+
+def _workbook(data):
+    from openpyxl import load_workbook
+    return load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+
+
+def _iter_baris(data, sheet):
+    """Baris sheet sebagai tuple nilai sel, streaming (calamine bila ada, selain itu openpyxl read-only)"""
+    if engine_cepat():
+        from python_calamine import CalamineWorkbook
+        wb = CalamineWorkbook.from_filelike(io.BytesIO(data))
+        try:
+            yield from wb.get_sheet_by_name(sheet).iter_rows()
+        finally:
+            wb.close()
+        return
+
+    wb = _workbook(data)
+    try:
+        yield from wb[sheet].iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def sheet_excel(data):
+    """Daftar nama sheet (tanpa membaca isi sheet)"""
+    wb = _workbook(data)
+    try:
+        return wb.sheetnames
+    finally:
+        wb.close()
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def preview_excel(data, sheet, n=5):
+    """Header (sudah di-uppercase) + n baris pertama; hanya baris awal yang di-parse"""
+    rows = _iter_baris(data, sheet)
+    try:
+        header = _header(next(rows, ()))
+        baris = [_lebar(row, len(header)) for _, row in zip(range(n), rows)]
+    finally:
+        rows.close()
+    return pd.DataFrame(baris, columns=header)
+
+
+def _header(header):
+    # normalisasi sama dengan upload CSV: nama kolom uppercase; sel kosong -> KOLOM_n (calamine: '', openpyxl: None)
+    return [str(h).strip().upper() if h not in (None, '') else f"KOLOM_{i + 1}" for i, h in enumerate(header)]
+
+
+def _lebar(row, n):
+    # baris bisa lebih pendek / panjang dari header
+    return (list(row) + [None] * n)[:n]
+
+
+def _ke_float(buf):
+    try:
+        # jalur cepat: semua sel angka / kosong (None -> NaN)
+        return np.array(buf, dtype=float).reshape(len(buf), -1)
+    except (TypeError, ValueError):
+        pass
+    arr = np.array(buf, dtype=object).reshape(len(buf), -1)
+    return np.column_stack([pd.to_numeric(arr[:, j], errors='coerce') for j in range(arr.shape[1])]) \
+        .astype(float)
+
+
+def iter_kolom_excel(data, sheet, kolom, chunk=CHUNK_BARIS):
+    """Stream kolom terpilih sebagai array float (m, len(kolom)) per potongan baris.
+
+    Header dan baris dibaca lewat jalur yang sama dengan preview_excel
+    (calamine bila ada, selain itu openpyxl read-only); sheet tidak pernah
+    dimuat penuh ke DataFrame. Nilai non-numerik menjadi NaN.
+    """
+    rows = _iter_baris(data, sheet)
+    try:
+        header = _header(next(rows, ()))
+        idx = [header.index(k) for k in kolom]
+        buf = []
+        for row in rows:
+            buf.append([row[i] if i < len(row) else None for i in idx])
+            if len(buf) == chunk:
+                yield _ke_float(buf)
+                buf = []
+        if buf:
+            yield _ke_float(buf)
+    finally:
+        rows.close()
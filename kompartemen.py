@@ -0,0 +1,104 @@
+import json
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+# Nama kolom/properti yang dikenali sebagai nama poligon
+KOLOM_NAMA = ("NAMA", "NAME", "BLOK", "BLOCK", "KOMPARTEMEN", "POLYGON", "ID")
+
+
+def _nama(props, default):
+    for k, v in (props or {}).items():
+        if k.upper() in KOLOM_NAMA and v is not None:
+            return str(v)
+    return default
+
+
+def baca_poligon(uploaded_file):
+    """Baca poligon dari GeoJSON (Polygon/MultiPolygon) atau CSV (NAMA, X, Y per vertex).
+
+    Hasil: dict nama -> list ring (array (m, 2)); lubang/multi-part ikut
+    sebagai ring tambahan dan ditangani aturan even-odd.
+    """
+    nama_file = uploaded_file.name.lower()
+    poligon = {}
+    if nama_file.endswith((".geojson", ".json")):
+        data = json.load(uploaded_file)
+        fitur = data.get("features", [data]) if isinstance(data, dict) else []
+        for i, f in enumerate(fitur):
+            geom = f.get("geometry") or {}
+            if geom.get("type") == "Polygon":
+                parts = [geom["coordinates"]]
+            elif geom.get("type") == "MultiPolygon":
+                parts = geom["coordinates"]
+            else:
+                continue
+            rings = [np.asarray(r, dtype=float)[:, :2] for part in parts for r in part]
+            poligon.setdefault(_nama(f.get("properties"), f"Poligon {i + 1}"), []).extend(rings)
+    else:
+        df = pd.read_csv(uploaded_file)
+        df.columns = [c.upper() for c in df.columns]
+        if not {"X", "Y"}.issubset(df.columns):
+            raise ValueError("CSV poligon wajib punya kolom X dan Y (opsional NAMA per vertex).")
+        kolom = next((c for c in KOLOM_NAMA if c in df.columns), None)
+        grup = df.groupby(kolom, sort=False) if kolom else [("Poligon 1", df)]
+        for nama, g in grup:
+            poligon[str(nama)] = [g[["X", "Y"]].to_numpy(dtype=float)]
+    return {k: v for k, v in poligon.items() if any(len(r) >= 3 for r in v)}
+
+
+@st.cache_data(show_spinner=False)
+def mask_poligon(rings, xs, ys):
+    """Mask node grid di dalam poligon (even-odd), di-cache per poligon + grid.
+
+    Per baris grid dihitung perpotongan tiap edge dengan garis Y, lalu
+    parity jumlah perpotongan di kiri node diperoleh lewat cumsum:
+    O(ny * edge + nx * ny) tanpa loop per sel.
+    """
+    ny, nx = len(ys), len(xs)
+    beda = np.zeros((ny, nx + 1), dtype=np.int32)
+    for ring in rings:
+        p1 = np.asarray(ring, dtype=float)
+        p2 = np.roll(p1, -1, axis=0)
+        # edge x baris yang benar-benar memotong garis Y
+        potong = (p1[None, :, 1] <= ys[:, None]) != (p2[None, :, 1] <= ys[:, None])
+        j, e = np.nonzero(potong)
+        cx = p1[e, 0] + (ys[j] - p1[e, 1]) * (p2[e, 0] - p1[e, 0]) / (p2[e, 1] - p1[e, 1])
+        np.add.at(beda, (j, np.searchsorted(xs, cx, side='right')), 1)
+    return (np.cumsum(beda[:, :nx], axis=1) % 2).astype(bool)
+
+
+def volume_kompartemen(masks, tebal_woc, tebal_goc, cell_area, ntg, porosity, sw, bo, bg):
+    """GRV/STOIIP/GIIP per kompartemen: satu reduksi ber-mask (matmul) untuk semua poligon"""
+    nama = list(masks)
+    m = np.stack([masks[k].ravel() for k in nama]).astype(float)
+    valid = np.isfinite(tebal_woc).ravel()
+    luar = ~m.astype(bool).any(axis=0)
+    m = np.vstack([m, luar.astype(float)])
+    nama.append("(Di luar poligon)")
+
+    total = m @ np.nan_to_num(tebal_woc).ravel() * cell_area
+    gas = m @ np.nan_to_num(tebal_goc).ravel() * cell_area
+    oil = np.maximum(total - gas, 0)
+    faktor = ntg * porosity * (1 - sw)
+    return pd.DataFrame({
+        "Kompartemen": nama,
+        "Luas (km²)": m @ valid * cell_area / 1e6,
+        "GRV Gas (Juta m³)": gas / 1e6,
+        "GRV Oil (Juta m³)": oil / 1e6,
+        "GRV Total (Juta m³)": total / 1e6,
+        "STOIIP (MMbbls)": oil * faktor / bo / 1e6,
+        "GIIP (BCF)": gas * faktor / bg / 1e9,
+    })
+
+
+def trace_poligon(poligon, color='purple'):
+    """Outline poligon (ring dipisah NaN) untuk peta 2D"""
+    traces = []
+    for nama, rings in poligon.items():
+        xy = np.concatenate([np.vstack([r, r[:1], [[np.nan, np.nan]]]) for r in rings])
+        traces.append(go.Scatter(x=xy[:, 0], y=xy[:, 1], mode='lines', name=nama,
+                                 line=dict(width=2, color=color), legendgroup='poligon'))
+    return traces
@@ -0,0 +1,129 @@
+import json
+
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+
+# Tabel marching squares: kasus (bit sudut di atas level) -> pasangan edge.
+# Sudut: 0=kiri-bawah, 1=kanan-bawah, 2=kanan-atas, 3=kiri-atas
+# Edge : 0=bawah, 1=kanan, 2=atas, 3=kiri
+_TABEL_EDGE = {
+    1: [(3, 0)], 2: [(0, 1)], 3: [(3, 1)], 4: [(1, 2)],
+    5: [(3, 0), (1, 2)], 6: [(0, 2)], 7: [(3, 2)], 8: [(2, 3)],
+    9: [(0, 2)], 10: [(0, 1), (2, 3)], 11: [(1, 2)], 12: [(1, 3)],
+    13: [(0, 1)], 14: [(3, 0)],
+}
+
+
+# Batas jumlah level kontur (interval terlalu kecil -> ribuan level marching squares)
+MAKS_LEVEL = 200
+
+
+def interval_efektif(z_min, z_max, interval):
+    """Interval yang dipakai: diperbesar bila menghasilkan lebih dari MAKS_LEVEL level"""
+    if not interval or interval <= 0 or z_max <= z_min:
+        return interval
+    return max(interval, (z_max - z_min) / (MAKS_LEVEL - 1))
+
+
+def level_kontur(z_min, z_max, interval):
+    """Daftar level kontur dari z_min s/d z_max dengan interval tetap (maks. MAKS_LEVEL level)"""
+    if not interval or interval <= 0 or z_max <= z_min:
+        return np.array([z_min])
+    interval = interval_efektif(z_min, z_max, interval)
+    return np.arange(z_min, z_max + interval * 1e-9, interval)[:MAKS_LEVEL]
+
+
+def segmen_kontur(grid_z, xs, ys, level):
+    """Marching squares vektor: segmen garis (m, 2, 2) untuk satu level.
+
+    Sel dengan sudut NaN (di luar hull) dilewati.
+    """
+    atas = grid_z > level
+    valid = np.isfinite(grid_z)
+    kasus = (atas[:-1, :-1].astype(np.int8) | (atas[:-1, 1:] << 1) |
+             (atas[1:, 1:] << 2) | (atas[1:, :-1] << 3))
+    lengkap = valid[:-1, :-1] & valid[:-1, 1:] & valid[1:, 1:] & valid[1:, :-1]
+    # hanya sel yang benar-benar dilewati kontur yang diproses lebih lanjut
+    j, i = np.nonzero(lengkap & (kasus > 0) & (kasus < 15))
+    kasus = kasus[j, i]
+
+    z0, z1 = grid_z[j, i], grid_z[j, i + 1]
+    z2, z3 = grid_z[j + 1, i + 1], grid_z[j + 1, i]
+    x0, x1, y0, y1 = xs[i], xs[i + 1], ys[j], ys[j + 1]
+
+    def t(za, zb):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (level - za) / (zb - za)
+
+    # titik potong di keempat edge tiap sel
+    tb, tr, tt, tl = t(z0, z1), t(z1, z2), t(z3, z2), t(z0, z3)
+    edge = [
+        np.column_stack([x0 + tb * (x1 - x0), y0]),
+        np.column_stack([x1, y0 + tr * (y1 - y0)]),
+        np.column_stack([x0 + tt * (x1 - x0), y1]),
+        np.column_stack([x0, y0 + tl * (y1 - y0)]),
+    ]
+
+    segmen = []
+    for c, pasangan in _TABEL_EDGE.items():
+        mask = kasus == c
+        if not mask.any():
+            continue
+        for a, b in pasangan:
+            segmen.append(np.stack([edge[a][mask], edge[b][mask]], axis=1))
+    return np.concatenate(segmen) if segmen else np.empty((0, 2, 2))
+
+
+@st.cache_data(show_spinner=False)
+def hitung_kontur(grid_z, xs, ys, levels):
+    """Segmen & luas tertutup per level, di-cache per grid dan interval kontur.
+
+    Luas tertutup = luas area yang lebih dangkal dari level (Z <= level),
+    memakai konvensi luas sel yang sama dengan perhitungan GRV.
+    """
+    dx = (xs[-1] - xs[0]) / (len(xs) - 1) if len(xs) > 1 else 0.0
+    dy = (ys[-1] - ys[0]) / (len(ys) - 1) if len(ys) > 1 else 0.0
+    z = grid_z[np.isfinite(grid_z)]
+    hasil = []
+    for lv in levels:
+        hasil.append({
+            'level': float(lv),
+            'segmen': segmen_kontur(grid_z, xs, ys, lv),
+            'luas': float((z <= lv).sum() * dx * dy),
+        })
+    return hasil
+
+
+def trace_kontur(kontur, color='rgba(60,60,60,0.6)'):
+    """Satu trace garis ringan per level (segmen dipisah NaN) + label level"""
+    traces = []
+    for k in kontur:
+        seg = k['segmen']
+        if len(seg) == 0:
+            continue
+        xy = np.concatenate([seg, np.full((len(seg), 1, 2), np.nan)], axis=1).reshape(-1, 2)
+        traces.append(go.Scatter(
+            x=xy[:, 0], y=xy[:, 1], mode='lines',
+            line=dict(width=1, color=color),
+            name=f"Z = {k['level']:.0f}", legendgroup='kontur', showlegend=False,
+            hoverinfo='name'
+        ))
+        tengah = seg[len(seg) // 2].mean(axis=0)
+        traces.append(go.Scatter(
+            x=[tengah[0]], y=[tengah[1]], mode='text', text=[f"{k['level']:.0f}"],
+            textfont=dict(size=9, color=color), showlegend=False, hoverinfo='skip'
+        ))
+    return traces
+
+
+def kontur_geojson(kontur):
+    """FeatureCollection GeoJSON: satu MultiLineString per level + luas tertutup"""
+    fitur = []
+    for k in kontur:
+        fitur.append({
+            'type': 'Feature',
+            'geometry': {'type': 'MultiLineString', 'coordinates': np.round(k['segmen'], 3).tolist()},
+            'properties': {'level': k['level'], 'luas_tertutup_m2': k['luas']},
+        })
+    return json.dumps({'type': 'FeatureCollection', 'features': fitur})
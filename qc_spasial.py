@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+# Default parameter QC
+TOLERANSI_DEKAT = 1.0      # jarak (satuan X/Y) dua sumur dianggap hampir sama
+K_TETANGGA = 8             # jumlah tetangga untuk statistik lokal Z
+AMBANG_SPIKE = 5.0         # ambang robust z-score (median/MAD) untuk spike
+
+
+def qc_spasial(x, y, z, toleransi=TOLERANSI_DEKAT, k=K_TETANGGA, ambang=AMBANG_SPIKE):
+    """QC spasial vektor berbasis cKDTree.
+
+    Mengembalikan DataFrame (satu baris per titik input) berisi flag
+    duplikat persis, duplikat dekat (dalam toleransi), ID cluster, dan
+    spike kedalaman terhadap median/MAD k tetangga terdekat.
+    """
+    x, y, z = (np.asarray(a, dtype=float) for a in (x, y, z))
+    xy = np.column_stack([x, y])
+    n = len(xy)
+    tree = cKDTree(xy)
+
+    # --- duplikat persis (X, Y sama); view complex jauh lebih cepat dari unique(axis=0) ---
+    _, inv, jumlah = np.unique(xy.view(np.complex128).ravel(), return_inverse=True, return_counts=True)
+    duplikat = jumlah[inv] > 1
+
+    # --- duplikat dekat: pasangan dalam toleransi -> cluster (komponen terhubung) ---
+    m = len(jumlah)
+    pasangan = inv[tree.query_pairs(r=toleransi, output_type='ndarray')] if toleransi > 0 \
+        else np.empty((0, 2), dtype=np.intp)
+    pasangan = pasangan[pasangan[:, 0] != pasangan[:, 1]]
+    graf = coo_matrix((np.ones(len(pasangan)), (pasangan[:, 0], pasangan[:, 1])), shape=(m, m))
+    _, label = connected_components(graf, directed=False)
+    dekat = np.bincount(label)[label[inv]] > 1
+
+    # --- spike: selisih terhadap median k tetangga terdekat (tanpa diri sendiri) ---
+    k_eff = min(k, n - 1)
+    skor = np.zeros(n)
+    if k_eff >= 2:
+        _, idx = tree.query(xy, k=k_eff + 1, workers=-1)
+        z_tetangga = z[idx[:, 1:]]
+        median = np.median(z_tetangga, axis=1)
+        residu = z - median
+        # skala = MAD lokal, tapi tidak lebih kecil dari MAD residu global
+        # (MAD dari k titik saja terlalu berisik -> banyak false positive)
+        mad_lokal = 1.4826 * np.median(np.abs(z_tetangga - median[:, None]), axis=1)
+        mad_global = 1.4826 * np.median(np.abs(residu - np.median(residu)))
+        skala = np.maximum(mad_lokal, mad_global)
+        skala[skala == 0] = 1.0
+        skor = np.abs(residu) / skala
+
+    return pd.DataFrame({
+        'QC_DUPLIKAT': duplikat,
+        'QC_DEKAT': dekat,
+        'QC_CLUSTER': label[inv],
+        'QC_SKOR_SPIKE': skor,
+        'QC_SPIKE': skor > ambang,
+    })
+
+
+def bersihkan_qc(df, hasil, buang_spike=True, gabung_dekat=True):
+    """Filter titik sebelum gridding berdasarkan hasil `qc_spasial`.
+
+    Spike dibuang; sumur yang hampir sama (satu cluster) digabung menjadi
+    satu titik di rata-rata X/Y/Z-nya.
+    """
+    df = df[['X', 'Y', 'Z']].reset_index(drop=True)
+    hasil = hasil.reset_index(drop=True)
+    if buang_spike:
+        df, hasil = df[~hasil['QC_SPIKE']], hasil[~hasil['QC_SPIKE']]
+    if gabung_dekat and (hasil['QC_DEKAT'] | hasil['QC_DUPLIKAT']).any():
+        df = df.groupby(hasil['QC_CLUSTER'].values, sort=False)[['X', 'Y', 'Z']].mean()
+    return df.reset_index(drop=True)
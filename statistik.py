@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+
+# Jumlah bin histogram untuk estimasi kuantil (galat <= 2 * rentang / N_BIN)
+N_BIN = 2048
+
+# Di bawah jumlah titik ini nilai asli disimpan sehingga kuantil eksak
+BATAS_EKSAK = 4096
+
+
+class _StatKolom:
+    """Akumulator satu kolom: count, mean, M2 (Welford/Chan), min, max, histogram"""
+
+    def __init__(self, n_bin=N_BIN):
+        self.n_bin = n_bin
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.hist = np.zeros(n_bin, dtype=np.int64)
+        self.lo = 0.0
+        self.w = 0.0
+        self.nilai = np.empty(0)
+
+    def _perlebar_hist(self, v_min, v_max):
+        """Sesuaikan bin agar [v_min, v_max] muat: geser per bin utuh kalau rentang
+        masih cukup, selain itu lebar bin terkecil w * 2^k yang menampung (bin lama digabung)"""
+        if self.w == 0.0:
+            rentang = v_max - v_min
+            self.w = rentang / (self.n_bin - 2) if rentang > 0 else max(abs(v_min), 1.0) * 1e-9
+            self.lo = np.floor(v_min / self.w) * self.w
+        if v_min >= self.lo and v_max < self.lo + self.n_bin * self.w:
+            return
+        # lo selalu kelipatan w, jadi bin lama pas bersarang di bin baru (k = 0: hanya geser)
+        w_baru = self.w
+        while True:
+            lo_baru = np.floor(v_min / w_baru) * w_baru
+            if v_max < lo_baru + self.n_bin * w_baru:
+                break
+            w_baru *= 2
+        isi = np.flatnonzero(self.hist)
+        tepi = self.lo + isi * self.w
+        idx = np.floor((tepi - lo_baru) / w_baru + 1e-9).astype(np.int64).clip(0, self.n_bin - 1)
+        hist = np.zeros(self.n_bin, dtype=np.int64)
+        np.add.at(hist, idx, self.hist[isi])
+        self.hist, self.lo, self.w = hist, lo_baru, w_baru
+
+    def _bin(self, v):
+        return np.floor((v - self.lo) / self.w).astype(np.int64).clip(0, self.n_bin - 1)
+
+    def tambah(self, v):
+        v = v[np.isfinite(v)]
+        if len(v) == 0:
+            return
+        nb, mb = len(v), v.mean()
+        m2b = ((v - mb) ** 2).sum()
+        n = self.n + nb
+        delta = mb - self.mean
+        self.mean += delta * nb / n
+        self.m2 += m2b + delta ** 2 * self.n * nb / n
+        self.n = n
+        self.min, self.max = min(self.min, v.min()), max(self.max, v.max())
+        self._perlebar_hist(self.min, self.max)
+        self.hist += np.bincount(self._bin(v), minlength=self.n_bin)
+        if self.nilai is not None:
+            self.nilai = np.concatenate([self.nilai, v]) if n <= BATAS_EKSAK else None
+
+    def hapus(self, v):
+        """Kebalikan `tambah`; False kalau min/max ikut terhapus (perlu scan ulang)"""
+        v = v[np.isfinite(v)]
+        if len(v) == 0:
+            return True
+        if v.min() <= self.min or v.max() >= self.max or len(v) >= self.n:
+            return False
+        nb, mb = len(v), v.mean()
+        m2b = ((v - mb) ** 2).sum()
+        n = self.n - nb
+        mean = (self.n * self.mean - nb * mb) / n
+        self.m2 = max(self.m2 - m2b - (mb - mean) ** 2 * n * nb / self.n, 0.0)
+        self.mean, self.n = mean, n
+        self.hist -= np.bincount(self._bin(v), minlength=self.n_bin)
+        if self.nilai is not None:
+            for x in v:
+                self.nilai = np.delete(self.nilai, np.flatnonzero(self.nilai == x)[-1])
+        return True
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else np.nan
+
+    def kuantil(self, q):
+        """Kuantil eksak untuk data kecil, selain itu perkiraan dari histogram"""
+        if self.n == 0:
+            return np.nan
+        if self.nilai is not None:
+            return float(np.quantile(self.nilai, q))
+        kum = np.cumsum(self.hist)
+        target = q * self.n
+        i = int(np.searchsorted(kum, target))
+        i = min(i, self.n_bin - 1)
+        sebelum = kum[i - 1] if i > 0 else 0
+        frac = (target - sebelum) / self.hist[i] if self.hist[i] else 0.0
+        return float(np.clip(self.lo + (i + frac) * self.w, self.min, self.max))
+
+
+class StatistikStreaming:
+    """Statistik ringkas satu-pass untuk kolom X, Y, Z yang diperbarui per batch.
+
+    Titik baru cukup di-merge (algoritma paralel Chan), jadi sidebar,
+    Smart Assistant, laporan dan tab ekstensi tidak perlu scan ulang
+    seluruh kolom setiap rerun.
+    """
+
+    def __init__(self, kolom=('X', 'Y', 'Z')):
+        self.kolom = list(kolom)
+        self.stat = {k: _StatKolom() for k in self.kolom}
+        self.n_baris = 0
+        self.sumber = None
+
+    def __getitem__(self, kolom):
+        return self.stat[kolom]
+
+    def rentang(self, kolom):
+        return self.stat[kolom].min, self.stat[kolom].max
+
+    def tambah(self, arr):
+        arr = np.asarray(arr, dtype=float).reshape(-1, len(self.kolom))
+        for j, k in enumerate(self.kolom):
+            self.stat[k].tambah(arr[:, j])
+        self.n_baris += len(arr)
+
+    def hapus(self, arr):
+        arr = np.asarray(arr, dtype=float).reshape(-1, len(self.kolom))
+        ok = all(self.stat[k].hapus(arr[:, j]) for j, k in enumerate(self.kolom))
+        self.n_baris -= len(arr)
+        return ok
+
+    def describe(self):
+        """Tabel setara `df.describe()` (kuantil berupa perkiraan)"""
+        baris = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+        data = {}
+        for k, s in self.stat.items():
+            data[k] = [s.n, s.mean if s.n else np.nan, s.std, s.min if s.n else np.nan,
+                       s.kuantil(0.25), s.kuantil(0.5), s.kuantil(0.75), s.max if s.n else np.nan]
+        return pd.DataFrame(data, index=baris)
+
+
+def _ke_array(records, kolom):
+    return np.array([[r.get(k, np.nan) for k in kolom] for r in records], dtype=float).reshape(-1, len(kolom))
+
+
+def statistik_titik(state, key='_statistik'):
+    """Statistik `data_points` di session_state, hanya memproses baris baru.
+
+    List yang diganti (reset, demo, load session) atau memendek tanpa
+    lewat `hapus_statistik` memicu hitung ulang penuh.
+    """
+    titik = state['data_points']
+    stat = state.get(key)
+    if stat is None or stat.sumber is not titik or stat.n_baris > len(titik):
+        stat = StatistikStreaming()
+        stat.sumber = titik
+        state[key] = stat
+    if len(titik) > stat.n_baris:
+        stat.tambah(_ke_array(titik[stat.n_baris:], stat.kolom))
+    return stat
+
+
+def hapus_statistik(state, records, key='_statistik'):
+    """Keluarkan titik yang baru dihapus dari statistik tanpa scan ulang"""
+    stat = state.get(key)
+    if stat is not None and not stat.hapus(_ke_array(records, stat.kolom)):
+        del state[key]
@@ -0,0 +1,136 @@
+import io
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from scipy.interpolate import RegularGridInterpolator
+
+from validasi import ALIAS_KOLOM, petakan_kolom
+
+# Alias kolom file survey (X/Y = koordinat wellhead, konstan per sumur)
+ALIAS_SURVEI = {
+    'WELL': ('WELL', 'WELL_NAME', 'SUMUR', 'NAMA', 'UWI'),
+    'X': ALIAS_KOLOM['X'],
+    'Y': ALIAS_KOLOM['Y'],
+    'MD': ('MD', 'MEASURED_DEPTH', 'DEPTH_MD'),
+    'INC': ('INC', 'INCL', 'INCLINATION', 'INKLINASI', 'DEVI'),
+    'AZI': ('AZI', 'AZIM', 'AZIMUTH', 'AZIMUT', 'HAZI'),
+}
+
+# Kolom opsional: MD marker top struktur per sumur
+ALIAS_TOP_MD = ('TOP_MD', 'MD_TOP', 'PICK_MD', 'MARKER_MD')
+
+
+def minimum_curvature(md, inc, azi, awal):
+    """Posisi semua stasiun semua sumur dalam satu pass vektor.
+
+    md, inc, azi (derajat) terurut per sumur lalu MD; `awal` True di stasiun
+    pertama tiap sumur. Stasiun pertama dianggap vertikal dari wellhead
+    (TVD = MD). Mengembalikan array (n, 3): North, East, TVD relatif wellhead.
+    """
+    n = len(md)
+    i, a = np.radians(inc), np.radians(azi)
+    i1, i2, a1, a2 = i[:-1], i[1:], a[:-1], a[1:]
+    cos_dl = np.cos(i2 - i1) - np.sin(i1) * np.sin(i2) * (1 - np.cos(a2 - a1))
+    dl = np.arccos(np.clip(cos_dl, -1.0, 1.0))
+    # ratio factor 2/DL * tan(DL/2) -> 1 untuk segmen lurus
+    rf = np.ones_like(dl)
+    lengkung = dl > 1e-9
+    rf[lengkung] = 2 / dl[lengkung] * np.tan(dl[lengkung] / 2)
+    h = np.diff(md) / 2 * rf
+
+    langkah = np.column_stack([
+        h * (np.sin(i1) * np.cos(a1) + np.sin(i2) * np.cos(a2)),
+        h * (np.sin(i1) * np.sin(a1) + np.sin(i2) * np.sin(a2)),
+        h * (np.cos(i1) + np.cos(i2)),
+    ])
+    langkah[awal[1:]] = 0  # segmen antar sumur bukan bagian lintasan
+    kum = np.vstack([np.zeros((1, 3)), np.cumsum(langkah, axis=0)])
+
+    # reset kumulatif di awal tiap sumur + tie-in vertikal sampai stasiun pertama
+    mulai = np.maximum.accumulate(np.where(awal, np.arange(n), 0))
+    kum -= kum[mulai]
+    kum[:, 2] += md[mulai]
+    return kum
+
+
+def _posisi_pada_md(lintasan, sumur, md):
+    """X, Y, TVD pada MD tertentu per sumur (interpolasi linear antar stasiun, vektor)"""
+    md_st, idx_st = lintasan['md'], lintasan['sumur']
+    # kunci gabungan (sumur, MD) terurut naik -> satu searchsorted untuk semua sumur
+    rentang = md_st.max() - md_st.min() + 1
+    kunci = idx_st * rentang + (md_st - md_st.min())
+    awal = np.searchsorted(idx_st, sumur, side='left')
+    akhir = np.searchsorted(idx_st, sumur, side='right') - 1
+    j = np.searchsorted(kunci, sumur * rentang + (md - md_st.min()))
+    j = np.clip(j, awal + 1, np.maximum(akhir, awal + 1))
+    j0, j1 = j - 1, np.minimum(j, akhir)
+    dmd = md_st[j1] - md_st[j0]
+    t = np.where(dmd > 0, (md - md_st[j0]) / np.where(dmd > 0, dmd, 1), 0.0)
+    ok = (md >= md_st[awal]) & (md <= md_st[akhir])
+    return [np.where(ok, lintasan[k][j0] + t * (lintasan[k][j1] - lintasan[k][j0]), np.nan)
+            for k in ('x', 'y', 'tvd')]
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def lintasan_sumur(data):
+    """Baca survey CSV dan hitung lintasan semua sumur (minimum curvature).
+
+    Mengembalikan dict array per stasiun ('sumur' indeks, 'md', 'x', 'y',
+    'tvd'), daftar 'nama' sumur, dan 'pick' (DataFrame WELL, MD, X, Y, Z dari
+    kolom TOP_MD) atau None.
+    """
+    df = pd.read_csv(io.BytesIO(data))
+    df.columns = [str(c).strip().upper() for c in df.columns]
+    mapping = petakan_kolom(df.columns, ALIAS_SURVEI)
+    kurang = [t for t, c in mapping.items() if c is None]
+    if kurang:
+        raise ValueError(f"Kolom survey {', '.join(kurang)} tidak ditemukan.")
+    top_md = petakan_kolom(df.columns, {'TOP_MD': ALIAS_TOP_MD})['TOP_MD']
+
+    nama, sumur_baris = np.unique(df[mapping['WELL']].astype(str).to_numpy(), return_inverse=True)
+    angka = df[[mapping[k] for k in ('X', 'Y', 'MD', 'INC', 'AZI')]] \
+        .apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    valid = np.isfinite(angka).all(axis=1)
+    sumur, angka = sumur_baris[valid], angka[valid]
+    urut = np.lexsort((angka[:, 2], sumur))
+    sumur, (x0, y0, md, inc, azi) = sumur[urut], angka[urut].T
+    if not len(md):
+        raise ValueError("Tidak ada stasiun survey yang valid.")
+
+    awal = np.r_[True, sumur[1:] != sumur[:-1]]
+    mulai = np.maximum.accumulate(np.where(awal, np.arange(len(md)), 0))
+    neu = minimum_curvature(md, inc, azi, awal)
+    lintasan = {
+        'nama': nama, 'sumur': sumur, 'md': md,
+        'x': x0[mulai] + neu[:, 1], 'y': y0[mulai] + neu[:, 0], 'tvd': neu[:, 2],
+        'pick': None,
+    }
+
+    if top_md is not None:
+        # nilai TOP_MD pertama yang terisi per sumur (sumur tanpa stasiun valid dibuang)
+        top = pd.to_numeric(df[top_md], errors='coerce').groupby(sumur_baris).first().dropna()
+        top = top[top.index.isin(sumur)]
+        idx = top.index.to_numpy()
+        px, py, pz = _posisi_pada_md(lintasan, idx, top.to_numpy(dtype=float))
+        lintasan['pick'] = pd.DataFrame({'WELL': nama[idx], 'MD': top.to_numpy(dtype=float),
+                                         'X': px, 'Y': py, 'Z': pz}).dropna().reset_index(drop=True)
+    return lintasan
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def potong_permukaan(lintasan, grid_z, xs, ys):
+    """Titik tembus lintasan ke permukaan struktur (crossing pertama dari atas ke bawah per sumur)"""
+    zs = RegularGridInterpolator((ys, xs), grid_z, bounds_error=False, fill_value=np.nan)(
+        np.column_stack([lintasan['y'], lintasan['x']]))
+    f = lintasan['tvd'] - zs
+    sumur = lintasan['sumur']
+    tembus = np.flatnonzero((f[:-1] < 0) & (f[1:] >= 0) & (sumur[1:] == sumur[:-1]))
+    tembus = tembus[np.unique(sumur[tembus], return_index=True)[1]]
+    t = -f[tembus] / (f[tembus + 1] - f[tembus])
+
+    def lerp(k):
+        return lintasan[k][tembus] + t * (lintasan[k][tembus + 1] - lintasan[k][tembus])
+
+    return pd.DataFrame({'WELL': lintasan['nama'][sumur[tembus]], 'MD': lerp('md'),
+                         'X': lerp('x'), 'Y': lerp('y'), 'Z': lerp('tvd')})
@@ -0,0 +1,24 @@
+import io
+
+import numpy as np
+
+from ekspor_grid import tulis_esri_ascii
+
+
+def _baca_asc(data):
+    baris = data.decode().splitlines()
+    header = dict(b.split() for b in baris[:6])
+    return header, np.loadtxt(baris[6:], ndmin=2)
+
+
+def test_esri_sel_tidak_persegi_diresample():
+    xs, ys = np.linspace(0, 100, 11), np.linspace(0, 50, 26)  # dx = 10, dy = 2
+    z = np.add.outer(2 * ys, xs)  # bidang linear: bilinear eksak
+    buf = io.BytesIO()
+    tulis_esri_ascii(buf, z, xs, ys)
+    header, grid = _baca_asc(buf.getvalue())
+    assert set(header) == {'ncols', 'nrows', 'xllcenter', 'yllcenter', 'cellsize', 'NODATA_value'}
+    assert float(header['cellsize']) == 2.0
+    assert grid.shape == (26, 51)
+    gx, gy = np.meshgrid(np.arange(51) * 2.0, np.arange(26)[::-1] * 2.0)
+    np.testing.assert_allclose(grid, gx + 2 * gy)
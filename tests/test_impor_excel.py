@@ -0,0 +1,39 @@
+import io
+
+import numpy as np
+import pytest
+from openpyxl import Workbook
+
+import impor_excel
+
+
+def _xlsx():
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Data"
+    ws.append(["x", "y", None, "z"])
+    ws.append([1.0, 2.0, "catatan", 100.0])
+    ws.append([3, 4, None, "bukan angka"])
+    ws.append([5.5, 6.5])
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize("engine", [None, "calamine"])
+def test_header_dan_stream_sama_di_semua_engine(monkeypatch, engine):
+    if engine:
+        pytest.importorskip("python_calamine")
+    monkeypatch.setattr(impor_excel, "engine_cepat", lambda: engine)
+    data = _xlsx()
+
+    preview = impor_excel.preview_excel.__wrapped__(data, "Data")
+    assert list(preview.columns) == ["X", "Y", "KOLOM_3", "Z"]
+
+    potongan = list(impor_excel.iter_kolom_excel(data, "Data", ["X", "KOLOM_3", "Z"], chunk=2))
+    assert [len(p) for p in potongan] == [2, 1]
+    arr = np.concatenate(potongan)
+    np.testing.assert_array_equal(arr[:, 0], [1.0, 3.0, 5.5])
+    assert np.isnan(arr[:, 1]).all()
+    np.testing.assert_array_equal(arr[:2, 2], [100.0, np.nan])
+    assert np.isnan(arr[2, 2])
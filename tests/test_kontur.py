@@ -0,0 +1,15 @@
+import numpy as np
+
+from kontur import MAKS_LEVEL, interval_efektif, level_kontur
+
+
+def test_jumlah_level_dibatasi():
+    level = level_kontur(1000.0, 3000.0, 0.01)
+    assert len(level) == MAKS_LEVEL
+    assert level[0] == 1000.0 and np.isclose(level[-1], 3000.0)
+    assert interval_efektif(1000.0, 3000.0, 0.01) > 0.01
+
+
+def test_interval_normal_tidak_diubah():
+    assert interval_efektif(1000.0, 1200.0, 50.0) == 50.0
+    np.testing.assert_allclose(level_kontur(1000.0, 1200.0, 50.0), [1000, 1050, 1100, 1150, 1200])
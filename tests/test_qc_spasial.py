@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from qc_spasial import qc_spasial, bersihkan_qc
+
+
+def _titik():
+    rng = np.random.default_rng(0)
+    x, y = rng.uniform(0, 1000, 50), rng.uniform(0, 1000, 50)
+    z = 1000 + 0.1 * x + rng.normal(0, 1, 50)
+    # titik 1 = duplikat persis titik 0 (X, Y sama)
+    x[1], y[1], z[1] = x[0], y[0], z[0] + 0.5
+    return x, y, z
+
+
+def test_duplikat_persis_ditandai():
+    x, y, z = _titik()
+    hasil = qc_spasial(x, y, z, toleransi=1.0)
+    assert hasil['QC_DUPLIKAT'].tolist()[:2] == [True, True]
+    assert not hasil['QC_DUPLIKAT'].iloc[2:].any()
+    bermasalah = hasil['QC_DUPLIKAT'] | hasil['QC_DEKAT'] | hasil['QC_SPIKE']
+    assert bermasalah.iloc[:2].all()
+
+
+def test_bersihkan_tetap_menyimpan_satu_titik_duplikat():
+    x, y, z = _titik()
+    df = pd.DataFrame({'X': x, 'Y': y, 'Z': z})
+    bersih = bersihkan_qc(df, qc_spasial(x, y, z, toleransi=1.0))
+    assert len(bersih) >= len(df) - 1
+    assert ((bersih['X'] == x[0]) & (bersih['Y'] == y[0])).sum() <= 1
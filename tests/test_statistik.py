@@ -0,0 +1,31 @@
+import numpy as np
+
+from statistik import BATAS_EKSAK, N_BIN, _StatKolom
+
+
+def test_kuantil_histogram_saat_rentang_terus_melebar():
+    rng = np.random.default_rng(0)
+    stat, semua = _StatKolom(), []
+    for i in range(50):
+        v = rng.normal(1000 + 50 * i, 100 * (i + 1), 300)
+        stat.tambah(v)
+        semua.append(v)
+    semua = np.concatenate(semua)
+    assert len(semua) > BATAS_EKSAK and stat.nilai is None
+
+    galat = 2 * np.ptp(semua) / N_BIN
+    assert stat.w <= galat
+    for q in (0.05, 0.25, 0.5, 0.75, 0.95):
+        assert abs(stat.kuantil(q) - np.quantile(semua, q)) <= galat
+
+
+def test_bin_bergeser_tanpa_melebar():
+    stat = _StatKolom()
+    stat.tambah(np.linspace(1000, 2000, 5000))
+    w = stat.w
+    # rentang total masih muat di N_BIN bin: lo cukup digeser, lebar bin tetap
+    baru = 2000 - (N_BIN - 1.5) * w
+    assert baru < stat.lo
+    stat.tambah(np.array([baru]))
+    assert stat.w == w and stat.lo <= baru
+    assert stat.hist.sum() == stat.n
@@ -0,0 +1,18 @@
+import numpy as np
+
+from triangulasi import MAKS_UPDATE_LOKAL, PermukaanInkremental
+
+
+def test_cubic_dibangun_ulang_setelah_batas_update_lokal():
+    rng = np.random.default_rng(0)
+    pts = np.column_stack([rng.uniform(0, 1000, 400), rng.uniform(0, 1000, 400), rng.uniform(1000, 1100, 400)])
+    surface = PermukaanInkremental(method='cubic').sinkron(pts)
+    maks = MAKS_UPDATE_LOKAL['cubic']
+    for i in range(maks + 1):
+        pts = np.vstack([pts, [[rng.uniform(300, 700), rng.uniform(300, 700), 1050.0]]])
+        surface.sinkron(pts)
+        if i < maks:
+            assert surface.n_lokal == i + 1
+    # update ke-(maks + 1) memicu bangun ulang: grid sama persis dengan hasil dari nol
+    assert surface.n_lokal == 0
+    np.testing.assert_array_equal(surface.grid_z, PermukaanInkremental(method='cubic').sinkron(pts).grid_z)
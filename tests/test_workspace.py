@@ -0,0 +1,50 @@
+import numpy as np
+
+from triangulasi import PermukaanInkremental
+from workspace import cari_lapangan, hapus_dataset, lepas_parameter, muat_dataset, muat_ke_session, simpan_dataset
+
+
+def _titik(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    x, y = rng.uniform(0, 1000, n), rng.uniform(0, 1000, n)
+    return np.column_stack([x, y, 1000 + 0.05 * x + 0.02 * y + rng.normal(0, 1, n)])
+
+
+def test_permukaan_tersimpan_tanpa_pickle(tmp_path):
+    path = str(tmp_path / "ws.db")
+    pts = _titik()
+    surface = PermukaanInkremental(method='linear').sinkron(pts)
+    records = [{'X': x, 'Y': y, 'Z': z} for x, y, z in pts.tolist()]
+    simpan_dataset("A", records, {'goc': 1010.0}, surface, path=path)
+
+    _, parameter, muat = muat_dataset("A", path=path)
+    assert parameter == {'goc': 1010.0}
+    np.testing.assert_array_equal(muat.grid_z, surface.grid_z)
+
+    # permukaan hasil muat tetap bisa di-update lokal seperti aslinya
+    baru = np.vstack([pts, [[500.0, 500.0, 1040.0]]])
+    np.testing.assert_allclose(muat.sinkron(baru).grid_z, surface.sinkron(baru).grid_z, equal_nan=True)
+
+
+def test_parameter_workspace_dilepas(tmp_path):
+    path = str(tmp_path / "ws.db")
+    simpan_dataset("A", [{'X': 0.0, 'Y': 0.0, 'Z': 1.0}], {'porosity': 0.3}, path=path)
+    state = {'goc': 1.0}
+    muat_ke_session(state, "A", path=path)
+    assert state['_param_ws'] == {'porosity': 0.3} and 'goc' not in state
+    state['goc'] = 2.0
+    lepas_parameter(state)
+    assert '_param_ws' not in state and 'goc' not in state
+
+
+def test_cari_lapangan_per_extent(tmp_path):
+    path = str(tmp_path / "ws.db")
+    simpan_dataset("Barat", [{'X': 0.0, 'Y': 0.0, 'Z': 1.0}, {'X': 100.0, 'Y': 100.0, 'Z': 1.0}], path=path)
+    simpan_dataset("Timur", [{'X': 500.0, 'Y': 0.0, 'Z': 1.0}, {'X': 600.0, 'Y': 100.0, 'Z': 1.0}], path=path)
+    assert cari_lapangan(50, 550, 50, 60, path=path) == ["Barat", "Timur"]
+    assert cari_lapangan(150, 400, 0, 100, path=path) == []
+    # simpan ulang dengan extent baru menggantikan extent lama
+    simpan_dataset("Barat", [{'X': 200.0, 'Y': 0.0, 'Z': 1.0}, {'X': 300.0, 'Y': 100.0, 'Z': 1.0}], path=path)
+    assert cari_lapangan(150, 400, 0, 100, path=path) == ["Barat"]
+    hapus_dataset("Barat", path=path)
+    assert cari_lapangan(0, 1000, 0, 1000, path=path) == ["Timur"]
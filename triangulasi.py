@@ -0,0 +1,314 @@
+import io
+import os
+
+import numpy as np
+from scipy.spatial import ConvexHull, Delaunay, cKDTree
+from scipy.interpolate import LinearNDInterpolator, CloughTocher2DInterpolator
+
+# Resolusi grid struktur utama (sama dengan grid 100x100 di app.py)
+GRID_N = 100
+
+# Kalau batch titik baru lebih besar dari fraksi ini, lebih murah bangun ulang
+BATAS_BATCH_INKREMENTAL = 0.1
+
+# Jumlah tetangga terdekat untuk triangulasi lokal (cubic butuh lebih banyak
+# karena estimasi gradien Clough-Tocher melibatkan beberapa ring vertex)
+K_LOKAL = {'linear': 32, 'cubic': 256}
+
+# Jumlah ring vertex di sekitar titik yang berubah yang ikut diinterpolasi
+# ulang pada mode cubic (pengaruh gradien meluruh cepat setelah ~3 ring)
+RING_GRADIEN = 3
+
+# Cubic: gradien Clough-Tocher lokal hanya mendekati gradien global. Rata-rata
+# selisih per sel kecil (orde mm), tapi maksimumnya bisa > 1 m pada data bernoise
+# dan terus menumpuk; setelah sekian update lokal grid dibangun ulang penuh.
+# Linear identik dengan bangun ulang penuh -> tanpa batas.
+MAKS_UPDATE_LOKAL = {'cubic': 25}
+
+# Mode grid ringkas: PBP_GRID_FLOAT32=1 menyimpan grid Z sebagai float32
+# (separuh memori per sesi); default float64
+GRID_DTYPE = np.float32 if os.environ.get("PBP_GRID_FLOAT32", "0") not in ("", "0") else np.float64
+
+
+def _lingkar_luar(p):
+    """Pusat & jari-jari lingkaran luar untuk array segitiga (m, 3, 2)"""
+    a, b, c = p[:, 0], p[:, 1], p[:, 2]
+    ab, ac = b - a, c - a
+    d = 2 * (ab[:, 0] * ac[:, 1] - ab[:, 1] * ac[:, 0])
+    ab2, ac2 = (ab ** 2).sum(1), (ac ** 2).sum(1)
+    ux = (ac[:, 1] * ab2 - ab[:, 1] * ac2) / d
+    uy = (ab[:, 0] * ac2 - ac[:, 0] * ab2) / d
+    return a + np.column_stack([ux, uy]), np.hypot(ux, uy)
+
+
+class PermukaanInkremental:
+    """Titik unik, triangulasi Delaunay, dan grid Z hasil interpolasi.
+
+    Menambah / menghapus satu titik hanya men-triangulasi ulang tetangga
+    terdekatnya dan menginterpolasi ulang sel grid di segitiga yang berubah,
+    tanpa dedup & triangulasi ulang semua titik.
+
+    Grid disimpan ringkas: sumbu 1-D `xs`, `ys` + satu array `grid_z`;
+    `grid_x` / `grid_y` hanya view broadcast (tanpa alokasi).
+    """
+
+    def __init__(self, nx=GRID_N, ny=GRID_N, method='cubic', dtype=GRID_DTYPE):
+        self.nx, self.ny = nx, ny
+        self.method = method
+        self.dtype = dtype
+        self.raw = np.empty((0, 3))
+        self._tri = None
+        self.grid_z = None
+        self.n_lokal = 0
+
+    # ---------------- grid ringkas ----------------
+    @property
+    def grid_x(self):
+        return np.broadcast_to(self.xs, (len(self.ys), len(self.xs)))
+
+    @property
+    def grid_y(self):
+        return np.broadcast_to(self.ys[:, None], (len(self.ys), len(self.xs)))
+
+    @property
+    def luas_sel(self):
+        """Luas satu sel grid (dx * dy)"""
+        dx = (self.xs[-1] - self.xs[0]) / (len(self.xs) - 1) if len(self.xs) > 1 else 1.0
+        dy = (self.ys[-1] - self.ys[0]) / (len(self.ys) - 1) if len(self.ys) > 1 else 1.0
+        return dx * dy
+
+    def tebal_di_atas(self, kontak, out=None):
+        """Tebal kolom dari top struktur ke kontak (negatif -> 0, NaN di luar hull).
+
+        Dihitung in-place dengan dtype grid; `out` boleh array lama
+        berukuran sama untuk dipakai ulang.
+        """
+        out = np.subtract(kontak, self.grid_z, out=out)
+        return np.maximum(out, 0, out=out)
+
+    # ---------------- arsip (cache workspace) ----------------
+    _ARSIP = ('raw', 'uxy', 'zsum', 'cnt', 'xs', 'ys', 'grid_z', 'di_hull', 'hull_eq')
+
+    def ke_bytes(self):
+        """Arsip .npz berisi array numerik saja (tanpa pickle)"""
+        buf = io.BytesIO()
+        np.savez(buf, **{k: getattr(self, k) for k in self._ARSIP},
+                 meta=np.array([self.nx, self.ny, self.n_tree, self.n_lokal]), method=np.array(self.method))
+        return buf.getvalue()
+
+    @classmethod
+    def dari_bytes(cls, data):
+        """Kebalikan ke_bytes; KD-tree & index dibangun ulang, triangulasi global saat dibutuhkan"""
+        with np.load(io.BytesIO(data), allow_pickle=False) as f:
+            nx, ny, n_tree, n_lokal = (int(v) for v in f['meta'])
+            self = cls(nx, ny, method=str(f['method']), dtype=f['grid_z'].dtype.type)
+            for k in cls._ARSIP:
+                setattr(self, k, f[k])
+        self.n_tree, self.n_lokal = n_tree, n_lokal
+        self.tree = cKDTree(self.uxy[:n_tree])
+        aktif = np.flatnonzero(self.cnt > 0)
+        self.index = dict(zip(map(tuple, self.uxy[aktif].tolist()), aktif.tolist()))
+        return self
+
+    # ---------------- titik unik (pengganti groupby X,Y mean) ----------------
+    def _dedup(self, pts):
+        uxy, inv = np.unique(pts[:, :2], axis=0, return_inverse=True)
+        inv = inv.ravel()
+        self.uxy = uxy
+        self.zsum = np.bincount(inv, weights=pts[:, 2], minlength=len(uxy))
+        self.cnt = np.bincount(inv, minlength=len(uxy)).astype(float)
+        self.index = {k: i for i, k in enumerate(map(tuple, uxy.tolist()))}
+
+    def titik_unik(self):
+        """Koordinat (n, 2) dan Z rata-rata titik unik yang masih aktif"""
+        aktif = self.cnt > 0
+        return self.uxy[aktif], self.zsum[aktif] / self.cnt[aktif]
+
+    @property
+    def tri(self):
+        """Triangulasi global titik unik aktif (dibangun ulang bila usang)"""
+        if self._tri is None:
+            self._tri = Delaunay(self.titik_unik()[0])
+        return self._tri
+
+    def _interpolator(self, tri, z):
+        if self.method == 'cubic':
+            try:
+                return CloughTocher2DInterpolator(tri, z)
+            except Exception:
+                pass
+        return LinearNDInterpolator(tri, z)
+
+    # ---------------- bangun penuh ----------------
+    def bangun_ulang(self, pts):
+        """Dedup, triangulasi dan interpolasi penuh dari nol"""
+        self.raw = np.asarray(pts, dtype=float)
+        self.n_lokal = 0
+        self._dedup(self.raw)
+        self._tri = Delaunay(self.uxy)
+
+        # indeks spasial & hull untuk operasi lokal berikutnya
+        self.tree = cKDTree(self.uxy)
+        self.n_tree = len(self.uxy)
+        self.di_hull = np.zeros(self.n_tree, dtype=bool)
+        self.di_hull[self._tri.convex_hull.ravel()] = True
+        self.hull_eq = ConvexHull(self.uxy[self.di_hull]).equations
+
+        self.xs = np.linspace(self.raw[:, 0].min(), self.raw[:, 0].max(), self.nx)
+        self.ys = np.linspace(self.raw[:, 1].min(), self.raw[:, 1].max(), self.ny)
+        self.grid_z = self._interpolator(self._tri, self.zsum / self.cnt)(
+            self.xs[None, :], self.ys[:, None]).astype(getattr(self, 'dtype', np.float64), copy=False)
+
+    def sinkron(self, pts):
+        """Samakan permukaan dengan daftar titik terbaru.
+
+        Titik yang ditambahkan di ujung atau dihapus dari ujung (pola form
+        "Tambah Titik" / "Hapus Titik Terakhir") diproses lokal; perubahan
+        lain (reset, demo, upload besar, titik di hull) dibangun ulang, begitu
+        juga setelah MAKS_UPDATE_LOKAL update lokal (mode cubic).
+        """
+        pts = np.asarray(pts, dtype=float)
+        n_lama, n = len(self.raw), len(pts)
+        ok = False
+        maks = MAKS_UPDATE_LOKAL.get(self.method)
+        if self.grid_z is not None and n > 0 and (maks is None or self.n_lokal + abs(n - n_lama) <= maks):
+            try:
+                if n >= n_lama and np.array_equal(pts[:n_lama], self.raw):
+                    ok = n == n_lama or (n - n_lama <= max(1, BATAS_BATCH_INKREMENTAL * n_lama)
+                                         and all(self._tambah(p) for p in pts[n_lama:]))
+                elif n < n_lama and np.array_equal(pts, self.raw[:n]):
+                    ok = all(self._hapus() for _ in range(n_lama - n))
+            except Exception:
+                ok = False
+        if not ok:
+            self.bangun_ulang(pts)
+        return self
+
+    # ---------------- operasi lokal ----------------
+    def _tambah(self, p):
+        x, y, z = p.tolist()
+        i = self.index.get((x, y))
+        if i is None:
+            # titik baru harus di dalam hull agar sumbu grid & batas NaN tetap
+            if np.any(self.hull_eq[:, :2] @ [x, y] + self.hull_eq[:, 2] >= -1e-9):
+                return False
+            i = self.index[(x, y)] = len(self.uxy)
+            self.uxy = np.vstack([self.uxy, [[x, y]]])
+            self.zsum = np.append(self.zsum, 0.0)
+            self.cnt = np.append(self.cnt, 0.0)
+        self.zsum[i] += z
+        self.cnt[i] += 1
+        self.raw = np.vstack([self.raw, p])
+        return self._perbarui_lokal(i)
+
+    def _hapus(self):
+        x, y, z = self.raw[-1].tolist()
+        i = self.index[(x, y)]
+        if self.cnt[i] == 1 and i < self.n_tree and self.di_hull[i]:
+            return False  # vertex hull: batas interpolasi ikut berubah
+        self.zsum[i] -= z
+        self.cnt[i] -= 1
+        self.raw = self.raw[:-1]
+        if self.cnt[i] == 0:
+            del self.index[(x, y)]
+            self.zsum[i] = 0.0
+            return self._perbarui_lokal(i, hapus=True)
+        return self._perbarui_lokal(i)
+
+    def _tetangga(self, c, k):
+        """Indeks vertex aktif terdekat dari c + radius yang dijamin lengkap"""
+        k_tree = min(k, self.n_tree)
+        d, idx = self.tree.query(c, k=k_tree)
+        idx, d = np.atleast_1d(idx), np.atleast_1d(d)
+        r = d[-1] if k_tree < self.n_tree else np.inf
+        if len(self.uxy) > self.n_tree:
+            extra = np.arange(self.n_tree, len(self.uxy))
+            d_extra = np.hypot(*(self.uxy[extra] - c).T)
+            idx = np.concatenate([idx, extra[d_extra <= r]])
+        return idx[self.cnt[idx] > 0], r
+
+    def _perbarui_lokal(self, v, hapus=False, k=None):
+        """Interpolasi ulang sel grid di sekitar vertex v yang berubah.
+
+        Triangulasi dibangun hanya dari k tetangga terdekat. Segitiga lokal
+        hanya dipakai kalau lingkaran luarnya berada di dalam bola tetangga
+        (berarti identik dengan segitiga Delaunay global); kalau tidak, k
+        diperbesar lalu menyerah ke bangun ulang penuh.
+        """
+        k_awal = K_LOKAL.get(self.method, 32)
+        k = k or k_awal
+        c = self.uxy[v]
+        lokal, r = self._tetangga(c, k)
+        if len(lokal) < 3:
+            return False
+        self._tri = None  # triangulasi global jadi usang
+
+        def valid(t, simplices):
+            pusat, rad = _lingkar_luar(t.points[simplices])
+            return bool(np.all(np.hypot(*(pusat - c).T) + rad <= r))
+
+        def ulangi():
+            if r == np.inf or k >= 4 * k_awal:
+                return False
+            return self._perbarui_lokal(v, hapus, 4 * k)
+
+        t = Delaunay(self.uxy[lokal])
+        s = t.simplices
+        hull = np.zeros(len(lokal), dtype=bool)
+        hull[t.convex_hull.ravel()] = True
+
+        ring = np.zeros(len(lokal), dtype=bool)
+        bintang = None
+        if hapus:
+            # bintang (star) vertex v sebelum dihapus = area yang berubah
+            t_lama = Delaunay(np.vstack([self.uxy[lokal], [c]]))
+            j = len(lokal)
+            star = (t_lama.simplices == j).any(axis=1)
+            if j in t_lama.convex_hull or not valid(t_lama, t_lama.simplices[star]):
+                return ulangi()
+            ring[t_lama.simplices[star][t_lama.simplices[star] != j]] = True
+            bintang = (t_lama, star)
+        else:
+            ring[np.flatnonzero(lokal == v)] = True
+            if self.method == 'cubic':
+                ring[s[ring[s].any(axis=1)]] = True
+
+        if self.method == 'cubic':
+            for _ in range(RING_GRADIEN - 1):
+                ring[s[ring[s].any(axis=1)]] = True
+        terdampak = ring[s].any(axis=1)
+        if hull[ring].any() or not valid(t, s[terdampak]):
+            return ulangi()
+
+        # sel kandidat = blok grid yang mencakup bbox area terdampak
+        titik = t.points[s[terdampak]].reshape(-1, 2)
+        i0, i1 = np.searchsorted(self.xs, [titik[:, 0].min(), titik[:, 0].max()])
+        j0, j1 = np.searchsorted(self.ys, [titik[:, 1].min(), titik[:, 1].max()])
+        i0, j0 = max(i0 - 1, 0), max(j0 - 1, 0)
+        i1, j1 = min(i1 + 1, self.nx), min(j1 + 1, self.ny)
+        gx, gy = np.meshgrid(self.xs[i0:i1], self.ys[j0:j1])
+        sel = np.column_stack([gx.ravel(), gy.ravel()])
+
+        simplex = t.find_simplex(sel)
+        ulang = np.zeros(len(sel), dtype=bool)
+        ulang[simplex >= 0] = terdampak[simplex[simplex >= 0]]
+        if bintang is not None:
+            simplex_lama = bintang[0].find_simplex(sel)
+            ulang[simplex_lama >= 0] |= bintang[1][simplex_lama[simplex_lama >= 0]]
+        if ulang.any():
+            z = self.zsum[lokal] / self.cnt[lokal]
+            blok = self.grid_z[j0:j1, i0:i1].ravel()  # salinan (slice tidak kontigu)
+            blok[ulang] = self._interpolator(t, z)(sel[ulang])
+            self.grid_z[j0:j1, i0:i1] = blok.reshape(j1 - j0, i1 - i0)
+        self.n_lokal += 1
+        return True
+
+
+def sinkronkan_permukaan(state, df, key='_permukaan'):
+    """Ambil permukaan tersimpan di session_state dan samakan dengan df"""
+    pts = df[['X', 'Y', 'Z']].to_numpy(dtype=float)
+    surface = state.get(key)
+    if surface is None:
+        surface = PermukaanInkremental()
+        state[key] = surface
+    return surface.sinkron(pts)
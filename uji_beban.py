@@ -0,0 +1,191 @@
+"""Uji beban lokal: N sesi AppTest headless berjalan bersamaan pada lapangan sintetis.
+
+Contoh:
+    python uji_beban.py --sesi 8 --titik 5000 --ulang 5
+
+Setiap sesi adalah satu proses (AppTest memakai runtime global, jadi satu
+proses = satu sesi) yang mensimulasikan interaksi khas: muat data, ubah
+kontak fluida, geser irisan, ganti sumber heatmap, sensitivity dan ekspor.
+Hasil: latensi rerun p50/p95/p99 per aksi + RSS puncak. Tanpa jaringan.
+
+Batasan (angka ini bukan latensi yang dirasakan pengguna):
+- Latensi = waktu eksekusi script di server, tanpa websocket dan render browser.
+- Tiap sesi punya proses, cache st.cache_data dan GIL sendiri: tidak ada
+  perebutan cache / CPU di dalam satu server bersama seperti `streamlit run`.
+  Kontensi yang terukur hanya antar-proses di mesin yang sama.
+- AppTest selalu menjalankan ulang seluruh script; rerun yang di produksi
+  hanya menjalankan satu st.fragment tetap diukur sebagai rerun penuh
+  (batas atas latensi fragment).
+- file_uploader tidak bisa dikendalikan AppTest, jadi "muat" mengisi titik
+  langsung ke session_state setelah melewati validasi ingest yang sama.
+- "ekspor" mengukur penulis grid (ekspor_grid) pada permukaan sesi untuk
+  semua format; laporan PDF/Excel (dibuat saat tombol diklik) tidak diukur.
+"""
+import argparse
+import multiprocessing as mp
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+# Sumber heatmap yang dirotasi tiap putaran (tanpa upload)
+SUMBER_HEATMAP = ["Porosity", "Sw", "NTG", "Depth (Z)", "Dip", "Dip Azimuth", "Curvature"]
+
+def lapangan_sintetis(n, seed=0):
+    """Antiklin dengan dua puncak + noise, kedalaman positif ke bawah (records X/Y/Z)"""
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(0, 5000, n)
+    y = rng.uniform(0, 4000, n)
+    z = (1400
+         - 250 * np.exp(-((x - 1800) ** 2 / 1.2e6 + (y - 2000) ** 2 / 8e5))
+         - 180 * np.exp(-((x - 3600) ** 2 / 6e5 + (y - 1800) ** 2 / 9e5))
+         + 0.02 * y + rng.normal(0, 3, n))
+    return pd.DataFrame({'X': x.round(2), 'Y': y.round(2), 'Z': z.round(2)})
+
+
+def _rss_kb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for baris in f:
+                if baris.startswith("VmRSS:"):
+                    return int(baris.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def _sesi(idx, args, mulai, antrian):
+    """Satu sesi pengguna; mengirim (idx, [(aksi, detik)], error, rss_puncak_kb) ke antrian"""
+    import logging
+    import resource
+    import warnings
+
+    logging.disable(logging.CRITICAL)
+    warnings.filterwarnings("ignore")
+    from streamlit.testing.v1 import AppTest
+
+    from ekspor_grid import FORMAT_GRID, grid_ke_bytes
+    from validasi import validasi_df
+
+    rng = np.random.default_rng(args.seed + idx)
+    records = validasi_df(lapangan_sintetis(args.titik, args.seed + idx))['df'].to_dict('records')
+    catatan, error = [], []
+
+    def jalan(aksi, at):
+        t0 = time.perf_counter()
+        at.run(timeout=args.timeout)
+        catatan.append((aksi, time.perf_counter() - t0))
+        error.extend(f"{aksi}: {str(e.value)[:200]}" for e in at.exception)
+
+    at = AppTest.from_file(APP, default_timeout=args.timeout)
+    mulai.wait()
+    jalan("buka", at)
+    at.session_state['data_points'] = records
+    jalan("muat", at)
+
+    z_min, z_max = min(r['Z'] for r in records), max(r['Z'] for r in records)
+    for putaran in range(args.ulang):
+        goc = float(rng.uniform(z_min, (z_min + z_max) / 2))
+        at.number_input(key="goc").set_value(round(goc, 1))
+        at.number_input(key="woc").set_value(round(goc + rng.uniform(20, 150), 1))
+        jalan("kontak", at)
+
+        irisan = [s for s in at.slider if s.label == "Pilih Posisi Irisan Y"]
+        if irisan:
+            s = irisan[0]
+            s.set_value(float(rng.uniform(s.min, s.max)))
+            jalan("irisan", at)
+
+        sumber = [s for s in at.selectbox if s.label == "Sumber properti:"]
+        if sumber:
+            sumber[0].select(SUMBER_HEATMAP[putaran % len(SUMBER_HEATMAP)])
+            jalan("heatmap", at)
+
+        tombol = [b for b in at.button if b.label.startswith("🚀 Jalankan Sensitivity")]
+        if tombol:
+            tombol[0].click()
+            jalan("sensitivity", at)
+
+        surface = at.session_state['_permukaan'] if '_permukaan' in at.session_state else None
+        if surface is not None and surface.grid_z is not None:
+            t0 = time.perf_counter()
+            for label in FORMAT_GRID:
+                try:
+                    grid_ke_bytes(label, surface.grid_z, surface.xs, surface.ys)
+                except Exception as e:
+                    error.append(f"ekspor {label}: {e}")
+            catatan.append(("ekspor", time.perf_counter() - t0))
+
+    antrian.put((idx, catatan, error, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+
+
+def ringkas(catatan):
+    """Tabel p50/p95/p99/max (ms) per aksi + gabungan semua rerun"""
+    df = pd.DataFrame(catatan, columns=['Aksi', 'Detik'])
+    df = pd.concat([df, df[df['Aksi'] != 'ekspor'].assign(Aksi='(semua rerun)')])
+    return df.groupby('Aksi', sort=False)['Detik'].agg(
+        N='size',
+        p50_ms=lambda s: np.percentile(s, 50) * 1e3,
+        p95_ms=lambda s: np.percentile(s, 95) * 1e3,
+        p99_ms=lambda s: np.percentile(s, 99) * 1e3,
+        max_ms=lambda s: s.max() * 1e3,
+    ).round(1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Uji beban sesi bersamaan untuk aplikasi Streamlit (lokal, tanpa jaringan)")
+    parser.add_argument("--sesi", type=int, default=4, help="jumlah sesi bersamaan (proses)")
+    parser.add_argument("--titik", type=int, default=2000, help="jumlah titik per lapangan sintetis")
+    parser.add_argument("--ulang", type=int, default=3, help="putaran interaksi per sesi")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=600, help="batas waktu satu rerun (detik)")
+    parser.add_argument("--csv", help="simpan semua latensi mentah ke file CSV")
+    args = parser.parse_args(argv)
+
+    # workspace sementara: uji beban tidak menyentuh workspace.db pengguna
+    os.environ["PBP_WORKSPACE"] = os.path.join(tempfile.mkdtemp(prefix="uji_beban_"), "workspace.db")
+
+    ctx = mp.get_context("spawn")
+    mulai, antrian = ctx.Event(), ctx.Queue()
+    proses = [ctx.Process(target=_sesi, args=(i, args, mulai, antrian), daemon=True) for i in range(args.sesi)]
+    for p in proses:
+        p.start()
+
+    # semua sesi mulai bersamaan; RSS total dipantau selama berjalan
+    mulai.set()
+    t0 = time.perf_counter()
+    hasil, rss_total = [], 0
+    while len(hasil) < len(proses):
+        rss_total = max(rss_total, sum(_rss_kb(p.pid) for p in proses if p.is_alive()))
+        while not antrian.empty():
+            hasil.append(antrian.get())
+        if not any(p.is_alive() for p in proses) and antrian.empty():
+            break
+        time.sleep(0.2)
+    durasi = time.perf_counter() - t0
+    for p in proses:
+        p.join()
+
+    catatan = [(aksi, detik) for _, c, _, _ in hasil for aksi, detik in c]
+    print(f"Sesi: {len(hasil)}/{args.sesi} selesai | titik/lapangan: {args.titik} | "
+          f"putaran: {args.ulang} | durasi: {durasi:.1f} s")
+    if catatan:
+        print(ringkas(catatan).to_string())
+    rss_sesi = [r for _, _, _, r in hasil]
+    if rss_sesi:
+        print(f"RSS puncak per sesi: max {max(rss_sesi) / 1024:.0f} MB, rata-rata {np.mean(rss_sesi) / 1024:.0f} MB")
+    print(f"RSS puncak total (semua sesi bersamaan): {rss_total / 1024:.0f} MB")
+    error = [e for _, _, err, _ in hasil for e in err]
+    for e in error[:10]:
+        print("ERROR", e)
+    if args.csv:
+        pd.DataFrame(catatan, columns=['Aksi', 'Detik']).to_csv(args.csv, index=False)
+    return 1 if error or len(hasil) < args.sesi else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
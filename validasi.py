@@ -0,0 +1,97 @@
+import io
+import re
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Alias nama kolom koordinat (dibandingkan setelah uppercase & buang non-alfanumerik)
+ALIAS_KOLOM = {
+    'X': ('X', 'EASTING', 'EAST', 'UTM_X', 'X_COORD', 'LONGITUDE', 'LONG', 'LON'),
+    'Y': ('Y', 'NORTHING', 'NORTH', 'UTM_Y', 'Y_COORD', 'LATITUDE', 'LAT'),
+    'Z': ('Z', 'DEPTH', 'TVD', 'TVDSS', 'KEDALAMAN', 'ELEVATION', 'ELEVASI', 'ELEV'),
+}
+
+# Kolom Z bernama seperti ini berisi elevasi (positif ke atas) -> dibalik jadi kedalaman
+ALIAS_ELEVASI = ('ELEVATION', 'ELEVASI', 'ELEV')
+
+
+def _norm(nama):
+    return re.sub(r'[^A-Z0-9]', '', str(nama).upper())
+
+
+def petakan_kolom(columns, alias_kolom=ALIAS_KOLOM):
+    """Kolom sumber untuk tiap target (default X, Y, Z) berdasarkan alias (None kalau tidak ketemu)"""
+    ada = {}
+    for c in columns:
+        ada.setdefault(_norm(c), c)
+    return {target: next((ada[_norm(a)] for a in alias if _norm(a) in ada), None)
+            for target, alias in alias_kolom.items()}
+
+
+def konvensi_z(nama_kolom, z):
+    """(balik, pesan): apakah Z perlu dikali -1 agar jadi kedalaman positif ke bawah"""
+    z = z[np.isfinite(z)]
+    if _norm(nama_kolom) in {_norm(a) for a in ALIAS_ELEVASI}:
+        return True, f"Kolom '{nama_kolom}' dibaca sebagai elevasi → dikonversi ke kedalaman (Z = -elevasi)."
+    if len(z) and (z < 0).mean() > 0.5:
+        return True, "Mayoritas nilai Z negatif (kemungkinan elevasi/TVDSS negatif) → dikonversi ke kedalaman positif."
+    if len(z) and (z < 0).any():
+        return False, f"{int((z < 0).sum())} nilai Z negatif di antara kedalaman positif — cek konvensi tanda."
+    return False, None
+
+
+def bersihkan_xyz(arr, balik=False):
+    """Buang baris NaN/inf secara vektor, balik tanda Z bila perlu.
+
+    Mengembalikan (array bersih (m, 3), jumlah baris kosong/non-angka,
+    jumlah baris tak hingga).
+    """
+    arr = np.asarray(arr, dtype=float).reshape(-1, 3)
+    nan = np.isnan(arr).any(axis=1)
+    inf = np.isinf(arr).any(axis=1) & ~nan
+    bersih = arr[~(nan | inf)]
+    if balik:
+        bersih[:, 2] *= -1
+    return bersih, int(nan.sum()), int(inf.sum())
+
+
+def validasi_df(df_raw):
+    """Tahap validasi ingest: mapping alias, koersi numerik, tolak NaN/inf, cek tanda Z"""
+    df_raw = df_raw.copy()
+    df_raw.columns = [str(c).strip().upper() for c in df_raw.columns]
+    mapping = petakan_kolom(df_raw.columns)
+    hasil = {'mapping': mapping, 'n_total': len(df_raw), 'df': None, 'pesan': [], 'error': None}
+    kurang = [t for t, c in mapping.items() if c is None]
+    if df_raw.empty:
+        hasil['error'] = "❌ Eits, file ini kosong !"
+        return hasil
+    if kurang:
+        hasil['error'] = (f"Format salah! Kolom {', '.join(kurang)} tidak ditemukan "
+                          f"(alias yang dikenali: {', '.join(a for t in kurang for a in ALIAS_KOLOM[t])}).")
+        return hasil
+
+    arr = df_raw[[mapping['X'], mapping['Y'], mapping['Z']]].apply(pd.to_numeric, errors='coerce') \
+        .to_numpy(dtype=float)
+    balik, pesan_z = konvensi_z(mapping['Z'], arr[:, 2])
+    bersih, n_nan, n_inf = bersihkan_xyz(arr, balik)
+    if n_nan:
+        hasil['pesan'].append(f"{n_nan} baris dibuang: X/Y/Z kosong atau bukan angka.")
+    if n_inf:
+        hasil['pesan'].append(f"{n_inf} baris dibuang: nilai tak hingga (inf).")
+    if pesan_z:
+        hasil['pesan'].append(pesan_z)
+    if not len(bersih):
+        hasil['error'] = "❌ Tidak ada baris valid setelah validasi (X/Y/Z harus angka)."
+        return hasil
+    hasil['df'] = pd.DataFrame(bersih, columns=['X', 'Y', 'Z'])
+    return hasil
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def validasi_csv(data):
+    """Baca + validasi CSV sekali per isi file (cache berdasarkan hash byte file)"""
+    df_raw = pd.read_csv(io.BytesIO(data))
+    hasil = validasi_df(df_raw)
+    hasil['preview'] = df_raw.head()
+    return hasil
@@ -0,0 +1,161 @@
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from scipy.interpolate import CloughTocher2DInterpolator, LinearNDInterpolator
+from scipy.spatial import Delaunay, cKDTree
+
+# Metode gridding yang dibandingkan (sama dengan pilihan griddata)
+METODE_CV = ('nearest', 'linear', 'cubic')
+
+# Jumlah tetangga untuk triangulasi lokal leave-one-out (titik uji tidak ikut);
+# cubic butuh ring lebih lebar karena gradien Clough-Tocher
+K_LOO = {'linear': 32, 'cubic': 64}
+
+# Tetangga terdekat yang di-query sekali untuk metode nearest pada k-fold
+K_NEAREST_FOLD = 16
+
+# Di bawah jumlah titik ini pool proses tidak sebanding overhead-nya
+MIN_TITIK_PARALEL = 5000
+
+# Titik uji per tugas leave-one-out yang dikirim ke worker
+UKURAN_CHUNK = 2000
+
+# Data titik di worker (dikirim sekali lewat initializer, bukan per tugas)
+_XY = _Z = None
+
+
+def _init(xy, z):
+    global _XY, _Z
+    _XY, _Z = xy, z
+
+
+def _interpolator(method, tri, z):
+    if method == 'cubic':
+        return CloughTocher2DInterpolator(tri, z)
+    return LinearNDInterpolator(tri, z)
+
+
+def _loo_chunk(method, uji, tetangga):
+    """Prediksi leave-one-out untuk titik `uji` dari triangulasi k tetangganya (tanpa dirinya)"""
+    hasil = np.full(len(uji), np.nan)
+    for j, (i, nb) in enumerate(zip(uji, tetangga)):
+        try:
+            hasil[j] = _interpolator(method, Delaunay(_XY[nb]), _Z[nb])(_XY[i])[0]
+        except Exception:
+            pass  # tetangga kolinear / titik di luar hull lokal -> NaN
+    return hasil
+
+
+def _fold(metode, uji):
+    """Satu fold: satu Delaunay titik latih dipakai bersama semua metode triangulasi"""
+    latih = np.ones(len(_XY), dtype=bool)
+    latih[uji] = False
+    tri = Delaunay(_XY[latih])
+    return {m: _interpolator(m, tri, _Z[latih])(_XY[uji]) for m in metode}
+
+
+def _eksekutor(xy, z, workers):
+    ctx = mp.get_context('spawn')  # aman dari server Streamlit multi-thread
+    return ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init, initargs=(xy, z))
+
+
+def _jalankan(xy, z, tugas, workers):
+    """Jalankan (fungsi, argumen...) berurutan atau di pool proses; hasil urut sesuai tugas"""
+    if workers <= 1 or len(xy) < MIN_TITIK_PARALEL:
+        _init(xy, z)
+        return [f(*a) for f, *a in tugas]
+    with _eksekutor(xy, z, workers) as ex:
+        return [fut.result() for fut in [ex.submit(f, *a) for f, *a in tugas]]
+
+
+def prediksi_silang(xy, z, metode=METODE_CV, mode='kfold', k_fold=5, seed=0, workers=None):
+    """Prediksi tiap titik sumur tanpa memakai titik itu sendiri.
+
+    mode 'loo'  : leave-one-out; triangulasi lokal dari tetangga terdekat
+                  (index KD-tree dibangun sekali dan dipakai semua titik).
+    mode 'kfold': titik dibagi acak ke k fold; tiap fold diprediksi dari
+                  triangulasi fold lainnya.
+    Tugas dibagi ke pool proses. Hasil: dict metode -> array prediksi (NaN
+    bila titik di luar hull / tidak bisa diinterpolasi).
+    """
+    xy = np.ascontiguousarray(xy, dtype=float)
+    z = np.ascontiguousarray(z, dtype=float)
+    n = len(xy)
+    workers = workers or os.cpu_count() or 1
+    tree = cKDTree(xy)
+    tri_metode = [m for m in metode if m != 'nearest']
+    hasil = {}
+
+    if mode == 'loo':
+        if 'nearest' in metode:
+            idx = tree.query(xy, k=min(2, n), workers=-1)[1]
+            hasil['nearest'] = z[idx[:, -1]] if n > 1 else np.full(n, np.nan)
+        tugas, potong = [], []
+        for m in tri_metode:
+            k = min(K_LOO[m], n - 1) + 1
+            tetangga = tree.query(xy, k=k, workers=-1)[1][:, 1:]
+            for awal in range(0, n, UKURAN_CHUNK):
+                uji = np.arange(awal, min(awal + UKURAN_CHUNK, n))
+                tugas.append((_loo_chunk, m, uji, tetangga[uji]))
+                potong.append(m)
+        keluaran = _jalankan(xy, z, tugas, workers)
+        for m in tri_metode:
+            hasil[m] = np.concatenate([h for h, mm in zip(keluaran, potong) if mm == m])
+        return hasil
+
+    fold = np.random.default_rng(seed).permutation(n) % k_fold
+    if 'nearest' in metode:
+        # tetangga terdekat yang bukan anggota fold yang sama, dari query bersama
+        k = min(K_NEAREST_FOLD, n - 1) + 1
+        idx = tree.query(xy, k=k, workers=-1)[1][:, 1:]
+        beda = fold[idx] != fold[:, None]
+        pertama = beda.argmax(axis=1)
+        pred = z[idx[np.arange(n), pertama]]
+        sisa = ~beda.any(axis=1)
+        for f in np.unique(fold[sisa]):
+            # jarang: semua k tetangga satu fold -> query ke titik latih fold itu
+            latih = np.flatnonzero(fold != f)
+            pilih = np.flatnonzero(sisa & (fold == f))
+            pred[pilih] = z[latih[cKDTree(xy[latih]).query(xy[pilih])[1]]]
+        hasil['nearest'] = pred
+    if tri_metode:
+        uji_fold = [np.flatnonzero(fold == f) for f in range(k_fold)]
+        keluaran = _jalankan(xy, z, [(_fold, tri_metode, u) for u in uji_fold], workers)
+        for m in tri_metode:
+            pred = np.full(n, np.nan)
+            for u, h in zip(uji_fold, keluaran):
+                pred[u] = h[m]
+            hasil[m] = pred
+    return hasil
+
+
+def ringkasan_galat(z, prediksi):
+    """RMSE / MAE / bias (prediksi - aktual) per metode, hanya titik yang terprediksi"""
+    baris = []
+    for m, p in prediksi.items():
+        r = p - z
+        r = r[np.isfinite(r)]
+        baris.append({
+            'Metode': m,
+            'N Terprediksi': len(r),
+            'RMSE': float(np.sqrt(np.mean(r ** 2))) if len(r) else np.nan,
+            'MAE': float(np.mean(np.abs(r))) if len(r) else np.nan,
+            'Bias': float(np.mean(r)) if len(r) else np.nan,
+        })
+    return pd.DataFrame(baris).sort_values('RMSE').reset_index(drop=True)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def validasi_silang(df, metode=METODE_CV, mode='kfold', k_fold=5, seed=0):
+    """(ringkasan galat per metode, residual per titik), di-cache per dataset & parameter"""
+    d = df.groupby(['X', 'Y'], as_index=False)['Z'].mean()
+    xy, z = d[['X', 'Y']].to_numpy(dtype=float), d['Z'].to_numpy(dtype=float)
+    prediksi = prediksi_silang(xy, z, tuple(metode), mode, k_fold, seed)
+    residual = d.copy()
+    for m, p in prediksi.items():
+        residual[f'RESIDUAL_{m.upper()}'] = p - z
+    return ringkasan_galat(z, prediksi), residual
@@ -0,0 +1,37 @@
+import numpy as np
+import streamlit as st
+
+
+def grv_tin(xy, z, simplices, kontak):
+    """Volume eksak batuan di atas kontak untuk permukaan TIN (linear per segitiga).
+
+    Tiap prisma segitiga dipotong bidang kontak secara analitik: integral
+    max(0, kontak - z) atas segitiga dengan z linear, tanpa grid.
+    """
+    p = xy[simplices]
+    luas = 0.5 * np.abs((p[:, 1, 0] - p[:, 0, 0]) * (p[:, 2, 1] - p[:, 0, 1]) -
+                        (p[:, 2, 0] - p[:, 0, 0]) * (p[:, 1, 1] - p[:, 0, 1]))
+    # tebal di tiap vertex, diurutkan a >= b >= c
+    h = -np.sort(z[simplices] - kontak, axis=1)
+    a, b, c = h[:, 0], h[:, 1], h[:, 2]
+
+    vol = np.zeros(len(h))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # ketiga vertex di atas kontak: prisma penuh
+        penuh = c >= 0
+        vol[penuh] = (a + b + c)[penuh] / 3
+        # hanya satu vertex di atas kontak: tetrahedron di pojok a
+        satu = (a > 0) & (b <= 0)
+        vol[satu] = (a ** 3 / (3 * (a - b) * (a - c)))[satu]
+        # dua vertex di atas: prisma penuh dikurangi bagian negatif di pojok c
+        dua = (b > 0) & (c < 0)
+        vol[dua] = ((a + b + c) / 3 - c ** 3 / (3 * (a - c) * (b - c)))[dua]
+    return float((vol * luas).sum())
+
+
+@st.cache_data(show_spinner=False)
+def volume_tin(xy, z, simplices, goc, woc):
+    """GRV gas cap, oil zone dan total dari TIN, di-cache per triangulasi + kontak"""
+    vol_total = grv_tin(xy, z, simplices, woc)
+    vol_gas = grv_tin(xy, z, simplices, goc)
+    return {'gas': vol_gas, 'oil': max(0.0, vol_total - vol_gas), 'total': vol_total}
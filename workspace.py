@@ -0,0 +1,169 @@
+import json
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from triangulasi import PermukaanInkremental
+
+# Lokasi file workspace (SQLite lokal, tanpa server / jaringan)
+WORKSPACE_DB = os.environ.get(
+    "PBP_WORKSPACE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "workspace.db"))
+
+# Parameter sidebar yang ikut disimpan per lapangan
+PARAMETER = ("goc", "woc", "porosity", "sw", "ntg", "bo", "bg")
+
+_SKEMA = """
+CREATE TABLE IF NOT EXISTS dataset (
+    id INTEGER PRIMARY KEY,
+    nama TEXT UNIQUE NOT NULL,
+    diubah TEXT,
+    parameter TEXT,
+    n_titik INTEGER,
+    x_min REAL, x_max REAL, y_min REAL, y_max REAL
+);
+CREATE TABLE IF NOT EXISTS titik (
+    id INTEGER PRIMARY KEY,
+    dataset_id INTEGER NOT NULL REFERENCES dataset(id) ON DELETE CASCADE,
+    x REAL, y REAL, z REAL
+);
+CREATE INDEX IF NOT EXISTS titik_dataset ON titik(dataset_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS titik_rtree USING rtree(id, min_x, max_x, min_y, max_y);
+CREATE VIRTUAL TABLE IF NOT EXISTS dataset_rtree USING rtree(id, min_x, max_x, min_y, max_y);
+CREATE TABLE IF NOT EXISTS hasil (
+    dataset_id INTEGER NOT NULL REFERENCES dataset(id) ON DELETE CASCADE,
+    kunci TEXT NOT NULL,
+    data BLOB,
+    PRIMARY KEY (dataset_id, kunci)
+);
+"""
+
+
+def _koneksi(path=None):
+    con = sqlite3.connect(path or WORKSPACE_DB)
+    con.execute("PRAGMA foreign_keys = ON")
+    con.execute("PRAGMA journal_mode = WAL")
+    con.executescript(_SKEMA)
+    return con
+
+
+def _hapus_isi(con, dataset_id):
+    con.execute("DELETE FROM titik_rtree WHERE id IN (SELECT id FROM titik WHERE dataset_id = ?)", (dataset_id,))
+    con.execute("DELETE FROM titik WHERE dataset_id = ?", (dataset_id,))
+    con.execute("DELETE FROM dataset_rtree WHERE id = ?", (dataset_id,))
+    con.execute("DELETE FROM hasil WHERE dataset_id = ?", (dataset_id,))
+
+
+def simpan_dataset(nama, records, parameter=None, permukaan=None, path=None):
+    """Simpan / timpa satu lapangan: titik + index R-tree, parameter, dan cache permukaan"""
+    pts = np.array([[r['X'], r['Y'], r['Z']] for r in records], dtype=float).reshape(-1, 3)
+    with closing(_koneksi(path)) as con, con:
+        baris = con.execute("SELECT id FROM dataset WHERE nama = ?", (nama,)).fetchone()
+        if baris:
+            dataset_id = baris[0]
+            _hapus_isi(con, dataset_id)
+        else:
+            dataset_id = con.execute("INSERT INTO dataset (nama) VALUES (?)", (nama,)).lastrowid
+        bbox = [float(v) for v in (pts[:, 0].min(), pts[:, 0].max(), pts[:, 1].min(), pts[:, 1].max())] \
+            if len(pts) else [None] * 4
+        con.execute("UPDATE dataset SET diubah = ?, parameter = ?, n_titik = ?, "
+                    "x_min = ?, x_max = ?, y_min = ?, y_max = ? WHERE id = ?",
+                    (datetime.now().isoformat(timespec='seconds'), json.dumps(parameter or {}),
+                     len(pts), *bbox, dataset_id))
+
+        con.executemany("INSERT INTO titik (dataset_id, x, y, z) VALUES (?, ?, ?, ?)",
+                        zip([dataset_id] * len(pts), *pts.T.tolist()))
+        con.execute("INSERT INTO titik_rtree SELECT id, x, x, y, y FROM titik WHERE dataset_id = ?",
+                    (dataset_id,))
+        if len(pts):
+            con.execute("INSERT INTO dataset_rtree VALUES (?, ?, ?, ?, ?)", (dataset_id, *bbox))
+        if permukaan is not None and permukaan.grid_z is not None:
+            # hanya array numerik (.npz tanpa pickle): file workspace bisa dibagikan dengan aman
+            con.execute("INSERT INTO hasil VALUES (?, 'permukaan_npz', ?)", (dataset_id, permukaan.ke_bytes()))
+
+
+def daftar_dataset(path=None):
+    """Ringkasan semua lapangan di workspace beserta bounding box-nya"""
+    with closing(_koneksi(path)) as con:
+        return pd.read_sql_query(
+            "SELECT nama AS Nama, n_titik AS Titik, x_min AS X_Min, x_max AS X_Max, "
+            "y_min AS Y_Min, y_max AS Y_Max, diubah AS Diubah FROM dataset ORDER BY nama", con)
+
+
+def muat_dataset(nama, path=None):
+    """(records, parameter, permukaan_cache atau None) untuk satu lapangan"""
+    with closing(_koneksi(path)) as con:
+        baris = con.execute("SELECT id, parameter FROM dataset WHERE nama = ?", (nama,)).fetchone()
+        if baris is None:
+            raise KeyError(nama)
+        dataset_id, parameter = baris
+        pts = con.execute("SELECT x, y, z FROM titik WHERE dataset_id = ? ORDER BY id",
+                          (dataset_id,)).fetchall()
+        blob = con.execute("SELECT data FROM hasil WHERE dataset_id = ? AND kunci = 'permukaan_npz'",
+                           (dataset_id,)).fetchone()
+    records = [{'X': x, 'Y': y, 'Z': z} for x, y, z in pts]
+    permukaan = None
+    if blob:
+        try:
+            permukaan = PermukaanInkremental.dari_bytes(blob[0])
+        except (ValueError, KeyError, OSError):
+            pass  # cache rusak -> permukaan dibangun ulang dari titik
+    return records, json.loads(parameter or "{}"), permukaan
+
+
+def hapus_dataset(nama, path=None):
+    with closing(_koneksi(path)) as con, con:
+        baris = con.execute("SELECT id FROM dataset WHERE nama = ?", (nama,)).fetchone()
+        if baris:
+            _hapus_isi(con, baris[0])
+            con.execute("DELETE FROM dataset WHERE id = ?", (baris[0],))
+
+
+def cari_bbox(x_min, x_max, y_min, y_max, path=None):
+    """Semua titik (lintas lapangan) di dalam bounding box, lewat index R-tree.
+
+    R-tree menyimpan batas float32 (dibulatkan keluar), jadi kandidat dicari
+    dengan overlap lalu difilter ulang memakai koordinat asli.
+    """
+    with closing(_koneksi(path)) as con:
+        return pd.read_sql_query(
+            "SELECT d.nama AS Lapangan, t.x AS X, t.y AS Y, t.z AS Z "
+            "FROM titik_rtree r JOIN titik t ON t.id = r.id JOIN dataset d ON d.id = t.dataset_id "
+            "WHERE r.max_x >= ? AND r.min_x <= ? AND r.max_y >= ? AND r.min_y <= ? "
+            "AND t.x BETWEEN ? AND ? AND t.y BETWEEN ? AND ?",
+            con, params=(x_min, x_max, y_min, y_max, x_min, x_max, y_min, y_max))
+
+
+def cari_lapangan(x_min, x_max, y_min, y_max, path=None):
+    """Nama lapangan yang extent-nya beririsan dengan bounding box"""
+    with closing(_koneksi(path)) as con:
+        return [n for (n,) in con.execute(
+            "SELECT d.nama FROM dataset_rtree r JOIN dataset d ON d.id = r.id "
+            "WHERE r.max_x >= ? AND r.min_x <= ? AND r.max_y >= ? AND r.min_y <= ? ORDER BY d.nama",
+            (x_min, x_max, y_min, y_max))]
+
+
+def _reset_kontak(state):
+    # widget kontak dibuat ulang dengan nilai default / tersimpan
+    for k in ('goc', 'woc'):
+        if k in state:
+            del state[k]
+
+
+def muat_ke_session(state, nama, path=None):
+    """Callback tombol buka: ganti titik, parameter dan permukaan aktif dengan lapangan tersimpan"""
+    records, parameter, permukaan = muat_dataset(nama, path)
+    state['data_points'] = records
+    state['_param_ws'] = parameter
+    _reset_kontak(state)
+    if permukaan is not None:
+        state['_permukaan'] = permukaan
+
+
+def lepas_parameter(state):
+    """Lupakan parameter lapangan workspace saat titik diganti dari sumber lain (reset, demo, session)"""
+    if state.pop('_param_ws', None) is not None:
+        _reset_kontak(state)